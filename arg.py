@@ -1,4 +1,5 @@
 from sys import argv, exit
+from importlib import import_module
 from colorama import Fore, Style, init
 
 init(autoreset=True)
@@ -16,6 +17,9 @@ class Arg:
 
     def add_command(self, command, desc=None, func=None, aliases=None, args_spec=None):
         """
+        func: a callable, or "module:function" to import only when the
+        command is dispatched.
+
         args_spec: dict of argument specs like:
         {
             "name": {"type": str, "required": True, "desc": "Package name"},
@@ -212,6 +216,10 @@ class Arg:
         parsed = self.parse_args(raw_args, args_spec)
 
         try:
-            selected_command["func"](parsed)
+            func = selected_command["func"]
+            if isinstance(func, str):
+                module, _, name = func.partition(":")
+                func = getattr(import_module(module), name)
+            func(parsed)
         except Exception as e:
             self.panic(f"An error occurred while executing the command: {e}")
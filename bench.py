@@ -0,0 +1,269 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import subprocess
+from colorama import Fore, Style
+
+# ----------------------------------------
+# pkgman'in kendi ek yükü için kıyaslama düzeneği
+#
+# `pkgman init` düzeninde (src/, include/, pkgman.py) yapay C projeleri üretir
+# ve her boyut için şu senaryoları ölçer:
+#   generate      yalnızca generate_makefile (eval_config sonrası)
+#   cold          boş derleme dizini ve boş nesne önbelleği
+#   noop          hiçbir şey değişmemişken yeniden derleme
+#   touch_header  tek bir ortak başlıkta gerçek değişiklik
+#   warm          build/ silinmiş, nesne önbelleği dolu
+# Sonuçlar revizyonlar arasında karşılaştırılabilen bir JSON dosyasına yazılır.
+# ----------------------------------------
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(REPO_DIR, "main.py")
+SCENARIOS = ("generate", "cold", "noop", "touch_header", "warm")
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+def generate_project(root, sources, per_lib=50, fanout=4, seed=0):
+    """
+    Write a synthetic project with `sources` .c files split into libraries
+    of `per_lib` files. Each source includes common.h, its library header and
+    `fanout` shared headers. Returns the number of libraries.
+    """
+    rng = random.Random(seed)
+    libs = max(1, -(-sources // per_lib))
+    pool = max(fanout * 4, 8)
+
+    os.makedirs(os.path.join(root, "include"), exist_ok=True)
+    with open(os.path.join(root, "include", "common.h"), "w") as f:
+        f.write("#ifndef BENCH_COMMON_H\n#define BENCH_COMMON_H\n#include <stddef.h>\n"
+                "typedef struct { int id; double value; } bench_item;\n#endif\n")
+    for k in range(pool):
+        with open(os.path.join(root, "include", f"h{k}.h"), "w") as f:
+            f.write(f"#ifndef BENCH_H{k}\n#define BENCH_H{k}\n#include \"common.h\"\n")
+            for n in range(20):
+                f.write(f"static inline int h{k}_f{n}(int x) {{ return x * {n + 1} + {k}; }}\n")
+            f.write("#endif\n")
+
+    written = 0
+    for i in range(libs):
+        lib_dir = os.path.join(root, "src", f"lib{i}")
+        os.makedirs(lib_dir, exist_ok=True)
+        count = min(per_lib, sources - written)
+        with open(os.path.join(root, "include", f"lib{i}.h"), "w") as f:
+            f.write(f"#ifndef BENCH_LIB{i}_H\n#define BENCH_LIB{i}_H\n")
+            f.writelines(f"int lib{i}_s{j}(int x);\n" for j in range(count))
+            f.write("#endif\n")
+        for j in range(count):
+            headers = rng.sample(range(pool), min(fanout, pool))
+            with open(os.path.join(lib_dir, f"s{j}.c"), "w") as f:
+                f.write(f'#include "lib{i}.h"\n')
+                f.writelines(f'#include "h{k}.h"\n' for k in headers)
+                body = " + ".join(f"h{k}_f{j % 20}(x)" for k in headers) or "x"
+                f.write(f"int lib{i}_s{j}(int x) {{ return {body}; }}\n")
+        written += count
+
+    with open(os.path.join(root, "src", "main.c"), "w") as f:
+        f.writelines(f'#include "lib{i}.h"\n' for i in range(libs))
+        f.write("int main(void) {\n    int total = 0;\n")
+        f.writelines(f"    total += lib{i}_s0(1);\n" for i in range(libs))
+        f.write("    return total == 0;\n}\n")
+
+    with open(os.path.join(root, "pkgman.py"), "w") as f:
+        f.write('project("bench")\ninclude("include")\n')
+        f.writelines(f'lib("lib{i}", *files("src/lib{i}/*.c"))\n' for i in range(libs))
+        f.write('exe("bench", "src/main.c")\n')
+    return libs
+
+# ----------------------------------------
+# Ölçüm
+# ----------------------------------------
+
+def _isolated_env(work):
+    """
+    Environment for measured runs: cache and config.json under work, no
+    PKGMAN_* overrides and no daemon, so user settings do not skew results.
+    """
+    env = {k: v for k, v in os.environ.items() if not k.startswith("PKGMAN_")}
+    env.update(XDG_CACHE_HOME=os.path.join(work, "cache"), XDG_CONFIG_HOME=os.path.join(work, "config"),
+               PKGMAN_DAEMON="0")
+    return env
+
+
+def _timed(cmd, cwd, env):
+    start = time.perf_counter()
+    result = subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise Exception(f"[ERROR] Benchmark step failed: {' '.join(cmd)}\n{result.stdout}")
+    return elapsed
+
+
+def _generate_time(cwd, env):
+    # Yalnızca generate_makefile; süreç başlangıcı, eval_config ve araç zinciri
+    # profili (ilk çalıştırmada yoklanır) hariç
+    code = ("import sys, time; sys.path.insert(0, %r); import mkgen\n"
+            "mkgen.eval_config('pkgman.py'); mkgen.resolve_toolchain()\n"
+            "t = time.perf_counter(); mkgen.generate_makefile()\n"
+            "print('BENCH', time.perf_counter() - t)" % REPO_DIR)
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return float(line.split()[1])
+    raise Exception(f"[ERROR] generate benchmark failed:\n{result.stdout}")
+
+
+def bench_size(sources, jobs=None, per_lib=50, fanout=4, keep=False):
+    work = tempfile.mkdtemp(prefix=f"pkgman-bench-{sources}-")
+    project = os.path.join(work, "project")
+    env = _isolated_env(work)
+    build = [sys.executable, MAIN, "build", "-j", str(jobs or os.cpu_count() or 1)]
+    try:
+        libs = generate_project(project, sources, per_lib=per_lib, fanout=fanout)
+        result = {"sources": sources, "libs": libs, "fanout": fanout}
+
+        # Araç zinciri profili burada oluşur; derleme ölçümlerine yoklama girmez
+        result["generate"] = _generate_time(project, env)
+        result["cold"] = _timed(build, project, env)
+        result["noop"] = _timed(build, project, env)
+        with open(os.path.join(project, "include", "h0.h"), "a") as f:
+            f.write("extern int bench_touched;\n")
+        result["touch_header"] = _timed(build, project, env)
+        shutil.rmtree(os.path.join(project, "build"))
+        result["warm"] = _timed(build, project, env)
+        return result
+    finally:
+        if not keep:
+            shutil.rmtree(work, ignore_errors=True)
+
+
+def _revision():
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(sizes=None, jobs=None, out_path="bench.json", per_lib=50, fanout=4):
+    sizes = sizes or DEFAULT_SIZES
+    report = {
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "jobs": jobs or os.cpu_count(),
+        "timestamp": time.time(),
+        "results": [],
+    }
+    for sources in sizes:
+        print(f"{Fore.CYAN}[BENCH]{Style.RESET_ALL} {sources} sources")
+        result = bench_size(sources, jobs=jobs, per_lib=per_lib, fanout=fanout)
+        report["results"].append(result)
+        print("  " + "  ".join(f"{name}={result[name]:.3f}s" for name in SCENARIOS))
+
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"{Fore.GREEN}[DONE]{Style.RESET_ALL} Results written to {out_path}")
+    return report
+
+
+# ----------------------------------------
+# Başlangıç süresi: -X importtime ile içe aktarma bütçesi
+#
+# Yorumlayıcının kendi açılışında yüklenenler (site, encodings, ...) boş bir
+# `python -c pass` çalıştırmasıyla ayrılır; bütçe yalnızca pkgman'in
+# tetiklediği içe aktarmaları kapsar.
+# ----------------------------------------
+
+STARTUP_COMMANDS = [["--help"], ["clean"], ["build", "--help"], ["daemon", "status"]]
+STARTUP_BUDGET_MS = 25
+STARTUP_RUNS = 5
+
+
+def _import_times(args, cwd, env):
+    """
+    [(module, self_us, cumulative_us, depth)] from `python -X importtime`.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), int(self_us), int(cumulative), depth))
+    return times
+
+
+def startup_check(budget_ms=STARTUP_BUDGET_MS, commands=None, runs=STARTUP_RUNS):
+    """
+    Time the imports pkgman triggers for trivial commands (best of `runs`)
+    and report the heaviest ones. Returns False if any command is over budget.
+    """
+    commands = commands or STARTUP_COMMANDS
+    work = tempfile.mkdtemp(prefix="pkgman-startup-")
+    env = _isolated_env(work)
+    ok = True
+    try:
+        baseline = {name for name, _, _, _ in _import_times(["-c", "pass"], work, env)}
+        for args in commands:
+            best = None
+            for _ in range(runs):
+                times = [t for t in _import_times([MAIN] + args, work, env) if t[0] not in baseline]
+                total = sum(self_us for _, self_us, _, _ in times)
+                if best is None or total < best[0]:
+                    best = (total, times)
+            total, times = best
+            over = total / 1000 > budget_ms
+            ok = ok and not over
+            color = Fore.RED if over else Fore.GREEN
+            print(f"{color}{total / 1000:>7.1f} ms{Style.RESET_ALL}  pkgman {' '.join(args)}")
+            # En ağır üst düzey içe aktarmalar
+            top = sorted((t for t in times if t[3] == 0), key=lambda t: -t[2])[:3]
+            print("           " + ", ".join(f"{name} {cumulative / 1000:.1f} ms" for name, _, cumulative, _ in top))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    print(f"{Fore.GREEN if ok else Fore.RED}[{'OK' if ok else 'FAILED'}]{Style.RESET_ALL} "
+          f"Import budget: {budget_ms} ms per command")
+    return ok
+
+
+def compare(old_path, new_path):
+    """
+    Print new/old time ratios per size and scenario (< 1.00 is faster).
+    """
+    with open(old_path, "r") as f:
+        old = {r["sources"]: r for r in json.load(f)["results"]}
+    with open(new_path, "r") as f:
+        new = json.load(f)
+    print(f"{'sources':>8}  " + "  ".join(f"{name:>12}" for name in SCENARIOS))
+    for result in new["results"]:
+        base = old.get(result["sources"])
+        if base is None:
+            continue
+        cells = []
+        for name in SCENARIOS:
+            ratio = result[name] / base[name] if base[name] else float("inf")
+            color = Fore.GREEN if ratio < 0.95 else Fore.RED if ratio > 1.05 else ""
+            cells.append(f"{color}{ratio:>11.2f}x{Style.RESET_ALL}")
+        print(f"{result['sources']:>8}  " + "  ".join(cells))
+
+
+def run_bench_command(args):
+    if args.get("startup"):
+        if not startup_check(args.get("budget", STARTUP_BUDGET_MS)):
+            raise Exception("[ERROR] Startup import budget exceeded.")
+        return
+    out = args.get("out", "bench.json")
+    if args.get("compare"):
+        compare(args["compare"], out)
+        return
+    sizes = args.get("sizes")
+    sizes = [int(n) for n in sizes.split(",")] if sizes else None
+    run_benchmarks(sizes, jobs=args.get("jobs"), out_path=out,
+                   per_lib=args.get("per-lib", 50), fanout=args.get("fanout", 4))
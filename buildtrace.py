@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from colorama import Fore, Style
+
+# ----------------------------------------
+# Derleme izleme (pkgman build --profile)
+#
+# Olaylar Chrome trace-event biçiminde ("ph": "X") bellekte toplanır ve
+# derleme sonunda tek seferde yazılır; chrome://tracing veya Perfetto ile
+# açılabilir. Kapalıyken her çağrı tek bir bayrak kontrolüdür.
+# ----------------------------------------
+
+TRACE_PATH = "build/pkgman.trace.json"
+
+_state = {"enabled": False, "origin": 0, "events": [], "lanes": {}}
+_lock = threading.Lock()
+
+
+def enable():
+    _state.update(enabled=True, origin=time.perf_counter_ns(), events=[], lanes={})
+
+
+def disable():
+    _state.update(enabled=False, events=[], lanes={})
+
+
+def enabled():
+    return _state["enabled"]
+
+
+def now():
+    """
+    Microseconds since tracing was enabled.
+    """
+    return (time.perf_counter_ns() - _state["origin"]) // 1000
+
+
+def _lane():
+    ident = threading.get_ident()
+    lanes = _state["lanes"]
+    if ident not in lanes:
+        with _lock:
+            lanes.setdefault(ident, len(lanes))
+    return lanes[ident]
+
+
+def add(name, cat, start, end, **args):
+    if not _state["enabled"]:
+        return
+    # list.append GIL altında atomik
+    _state["events"].append({
+        "name": name, "cat": cat, "ph": "X", "pid": os.getpid(), "tid": _lane(),
+        "ts": start, "dur": max(end - start, 0), "args": args,
+    })
+
+
+@contextmanager
+def span(name, cat, **args):
+    if not _state["enabled"]:
+        yield
+        return
+    start = now()
+    try:
+        yield
+    finally:
+        add(name, cat, start, now(), **args)
+
+
+def write(path=TRACE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": _state["events"], "displayTimeUnit": "ms"}, f)
+    return path
+
+# ----------------------------------------
+# Özet: en yavaş çeviri birimleri, kritik yol, elde edilen paralellik
+# ----------------------------------------
+
+def _ms(us):
+    return f"{us / 1000:.1f} ms"
+
+
+def summarize(actions, wall, top=10):
+    """
+    Print a summary for one engine run. actions is the engine's graph and
+    wall the run's duration in microseconds.
+    """
+    steps = {e["args"]["id"]: e for e in _state["events"] if "id" in e["args"]}
+    if not steps:
+        return
+
+    compiles = sorted((e for e in steps.values() if e["cat"] in ("compile", "pch")), key=lambda e: -e["dur"])
+    if compiles:
+        print(f"{Fore.CYAN}[PROFILE]{Style.RESET_ALL} Slowest translation units:")
+        for e in compiles[:top]:
+            cache = " (cache hit)" if e["args"].get("cache") == "hit" else ""
+            print(f"  {_ms(e['dur']):>10}  {e['name']}{cache}")
+
+    # Kritik yol: çalışan adımların süreleriyle grafikte en uzun zincir
+    finish = {}
+    via = {}
+    def visit(aid):
+        if aid not in finish:
+            best, best_dep = 0, None
+            for dep in actions[aid]["deps"]:
+                if visit(dep) > best:
+                    best, best_dep = finish[dep], dep
+            finish[aid] = best + (steps[aid]["dur"] if aid in steps else 0)
+            via[aid] = best_dep
+        return finish[aid]
+
+    end = max(actions, key=visit)
+    chain = []
+    while end is not None:
+        if end in steps:
+            chain.append(end)
+        end = via[end]
+    busy = sum(e["dur"] for e in steps.values())
+
+    print(f"{Fore.CYAN}[PROFILE]{Style.RESET_ALL} Critical path: {_ms(finish[max(finish, key=finish.get)])} of {_ms(wall)} wall")
+    for aid in reversed(chain):
+        print(f"  {_ms(steps[aid]['dur']):>10}  {steps[aid]['cat']:<8} {steps[aid]['name']}")
+    if wall > 0:
+        print(f"{Fore.CYAN}[PROFILE]{Style.RESET_ALL} Parallelism: {busy / wall:.2f} "
+              f"({len(steps)} step(s), {_ms(busy)} busy)")
@@ -0,0 +1,346 @@
+import os
+import sys
+import json
+import time
+import settings
+
+# ----------------------------------------
+# Proje başına derleme sunucusu (pkgman daemon)
+#
+# İstemci tarafı main.py'nin en başında çalışır ve yalnızca bu modülü ve
+# settings'i yükler. argv, çalışma dizini, ortam ve 0/1/2 dosya tanımlayıcıları
+# (SCM_RIGHTS) Unix soketi üzerinden gönderilir. Sunucu komutu bu
+# tanımlayıcılarla çalıştırır; çıktı (derleyicininki dahil) doğrudan
+# istemcinin terminaline gider, geriye yalnızca çıkış kodu döner.
+#
+# Sunucuda sıcak kalanlar: yüklü modüller, araç zinciri profili, yapılandırma
+# değerlendirmesi, bağımlılık veritabanı (dosya stat önbelleği) ve iş
+# parçacığı havuzu. Sunucu yoksa, sürümü tutmuyorsa ya da bağlantı koparsa
+# istemci komutu kendi sürecinde çalıştırır.
+#
+#   <cache_dir>/daemon/<proje anahtarı>.sock   soket
+#   <cache_dir>/daemon/<proje anahtarı>.lock   tek sunucu kilidi
+#   <cache_dir>/daemon/<proje anahtarı>.log    sunucu çıktısı
+#
+# main.py bu modülü her çağrıda yükler: socket ve hashlib yalnızca iletim
+# gerçekten gerektiğinde içe aktarılır.
+# ----------------------------------------
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(REPO_DIR, "main.py")
+# Yalnızca bu komutlar iletilir; watch, install, bench gibi uzun süren ya da etkileşimli komutlar yerelde çalışır
+FORWARDED = {"build", "b", "rebuild", "rb", "clean", "c"}
+
+
+def source_version():
+    """
+    Identity of the pkgman sources and interpreter; a daemon started from
+    different sources refuses requests and exits.
+    """
+    import hashlib
+    h = hashlib.sha256(sys.version.encode())
+    for name in sorted(os.listdir(REPO_DIR)):
+        if name.endswith(".py"):
+            st = os.stat(os.path.join(REPO_DIR, name))
+            h.update(f"{name}:{st.st_size}:{st.st_mtime_ns}\0".encode())
+    return h.hexdigest()[:16]
+
+
+def _base_path(root=None):
+    import hashlib
+    root = os.path.realpath(root or os.getcwd())
+    return os.path.join(settings.cache_dir(), "daemon", hashlib.sha256(root.encode()).hexdigest()[:16])
+
+
+def socket_path(root=None):
+    return _base_path(root) + ".sock"
+
+# ----------------------------------------
+# İstemci
+# ----------------------------------------
+
+def request(message, fds=()):
+    """
+    Send one JSON message (with `fds` attached) and return the JSON reply,
+    or None if no daemon answered.
+    """
+    import socket
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path())
+        data = json.dumps(message).encode() + b"\n"
+        sent = socket.send_fds(sock, [data], list(fds)) if fds else 0
+        sock.sendall(data[sent:])
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = sock.recv(4096)
+            if not chunk:
+                return None
+            reply += chunk
+        return json.loads(reply)
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+
+
+def forward(argv):
+    """
+    Run argv in this project's daemon when the `daemon` setting is on.
+    Returns the exit code, or None when the command should run in-process.
+    """
+    if not argv or argv[0] not in FORWARDED or not settings.get("daemon"):
+        return None
+    message = {"version": source_version(), "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+    try:
+        reply = request(message, fds=(0, 1, 2))
+    except KeyboardInterrupt:
+        # Soket kapandı; sunucu komutu kesecek
+        return 130
+    if reply is None or "exit" not in reply:
+        # Sunucu yok ya da eski sürüm: bu komut yerelde, sonrakiler yeni sunucuda
+        start()
+        return None
+    return reply["exit"]
+
+
+def start():
+    """
+    Spawn a detached daemon for the current project and return at once.
+    """
+    import subprocess
+    base = _base_path()
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    with open(base + ".log", "ab") as log:
+        subprocess.Popen([sys.executable, MAIN, "daemon", "run"], stdin=subprocess.DEVNULL,
+                         stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+# ----------------------------------------
+# Sunucu
+# ----------------------------------------
+
+def _acquire_lock(path, wait=5.0):
+    import fcntl
+    lock = open(path, "w")
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return lock
+        except BlockingIOError:
+            # Çıkmakta olan eski sürüm sunucuyu bekle
+            if time.monotonic() > deadline:
+                lock.close()
+                return None
+            time.sleep(0.1)
+
+
+def _exit_code(code):
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run(conn, message, fds, make_cli):
+    """
+    Run one forwarded command with the client's stdio, environment and argv.
+    """
+    import signal
+    import threading
+    import traceback
+    import colorama
+    import objcache
+    import buildtrace
+
+    done = threading.Event()
+    main_thread = threading.get_ident()
+
+    def watch_client():
+        # İstemci koparsa (Ctrl+C) komutu ana iş parçacığında KeyboardInterrupt ile kes
+        try:
+            conn.recv(1)
+        except OSError:
+            pass
+        if not done.is_set():
+            signal.pthread_kill(main_thread, signal.SIGINT)
+
+    saved_env = dict(os.environ)
+    saved_fds = [os.dup(fd) for fd in (0, 1, 2)]
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for fd, client_fd in zip((0, 1, 2), fds):
+        os.dup2(client_fd, fd)
+        os.close(client_fd)
+    os.environ.clear()
+    os.environ.update(message["env"])
+    settings.reset()
+    objcache.reset()
+    buildtrace.disable()
+    # Renk kararı (tty mi) istemcinin terminaline göre yeniden verilsin
+    sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    colorama.init(autoreset=True)
+
+    threading.Thread(target=watch_client, daemon=True).start()
+    code = 0
+    try:
+        cli = make_cli()
+        cli.args = ["pkgman"] + message["argv"]
+        cli.parse()
+    except SystemExit as e:
+        code = _exit_code(e.code)
+    except KeyboardInterrupt:
+        print("\n[INTERRUPTED]")
+        code = 130
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        done.set()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for fd, saved in zip((0, 1, 2), saved_fds):
+            os.dup2(saved, fd)
+            os.close(saved)
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        os.environ.clear()
+        os.environ.update(saved_env)
+    return code
+
+
+def _handle(conn, make_cli, version, info):
+    """
+    Serve one connection. Returns False when the daemon should exit.
+    """
+    import socket
+    fds = []
+    try:
+        data, fds, _, _ = socket.recv_fds(conn, 1 << 16, 3)
+        while data and not data.endswith(b"\n"):
+            chunk = conn.recv(1 << 16)
+            if not chunk:
+                break
+            data += chunk
+        message = json.loads(data)
+    except (OSError, ValueError):
+        for fd in fds:
+            os.close(fd)
+        return True
+
+    def reply(payload):
+        try:
+            conn.sendall(json.dumps(payload).encode() + b"\n")
+        except OSError:
+            pass
+
+    command = message.get("command")
+    if message.get("version") != version:
+        for fd in fds:
+            os.close(fd)
+        reply({"error": "version"})
+        print("[DAEMON] pkgman sources changed, exiting")
+        return False
+    if command == "stop":
+        reply({"ok": True})
+        return False
+    if command == "status":
+        reply(dict(info, ok=True))
+        return True
+    if len(fds) != 3 or os.path.realpath(message.get("cwd", "")) != info["root"]:
+        for fd in fds:
+            os.close(fd)
+        reply({"error": "bad request"})
+        return True
+
+    start = time.perf_counter()
+    code = _run(conn, message, fds, make_cli)
+    info["requests"] += 1
+    print(f"[DAEMON] {' '.join(message['argv'])} -> {code} ({time.perf_counter() - start:.2f}s)")
+    reply({"exit": code})
+    return True
+
+
+def serve(make_cli, idle_timeout=None):
+    """
+    Serve forwarded commands for the current project until idle for
+    idle_timeout seconds (daemon_idle_timeout setting by default).
+    """
+    import signal
+    import socket
+    idle_timeout = settings.get("daemon_idle_timeout") if idle_timeout is None else idle_timeout
+    base = _base_path()
+    path = base + ".sock"
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    lock = _acquire_lock(base + ".lock")
+    if lock is None:
+        print(f"[SKIP] A daemon is already serving {os.getcwd()}")
+        return
+
+    # Arka planda başlatılınca SIGINT yok sayılıyor olabilir; istemci kesmesi için gerekli
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    sys.stdout.reconfigure(line_buffering=True)
+    sys.stderr.reconfigure(line_buffering=True)
+    info = {"pid": os.getpid(), "root": os.path.realpath(os.getcwd()), "started": time.time(), "requests": 0}
+    version = source_version()
+
+    if os.path.exists(path):
+        os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+        server.listen(16)
+        server.settimeout(idle_timeout)
+        print(f"[DAEMON] Serving {info['root']} on {path} (pid {info['pid']})")
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                print(f"[DAEMON] Idle for {idle_timeout}s, exiting")
+                break
+            except KeyboardInterrupt:
+                break
+            conn.settimeout(None)
+            try:
+                keep = _handle(conn, make_cli, version, info)
+            finally:
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                conn.close()
+            if not keep:
+                break
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.remove(path)
+        lock.close()
+
+
+def run_daemon_command(args):
+    pos = args.get("_positional", [])
+    action = pos[0] if pos else "status"
+
+    if action == "run":
+        from main import make_cli
+        serve(make_cli, idle_timeout=args.get("idle-timeout"))
+    elif action == "start":
+        if request({"version": source_version(), "command": "status"}) is None:
+            start()
+        print(f"[DAEMON] Starting for {os.getcwd()} (socket: {socket_path()})")
+    elif action == "stop":
+        reply = request({"version": source_version(), "command": "stop"})
+        print("[DAEMON] Stopped." if reply else "[DAEMON] Not running.")
+    elif action == "status":
+        reply = request({"version": source_version(), "command": "status"})
+        if reply is None or not reply.get("ok"):
+            print("[DAEMON] Not running.")
+            return
+        print(f"PID      : {reply['pid']}")
+        print(f"Project  : {reply['root']}")
+        print(f"Uptime   : {time.time() - reply['started']:.0f}s")
+        print(f"Requests : {reply['requests']}")
+    else:
+        print(f"[!] Unknown daemon action: {action} (expected 'start', 'stop', 'status' or 'run')")
@@ -0,0 +1,258 @@
+import os
+import struct
+import hashlib
+import threading
+
+# ----------------------------------------
+# Başlık bağımlılık veritabanı (build/pkgman.depdb)
+#
+# Derleyicinin -MMD ile yazdığı .d dosyalarından beslenir. Dosya tablosu her
+# yol için diskteki son (mtime_ns, boyut, içerik özeti) bilgisini önbellekler;
+# her nesne ise derleme komutunun özetini ve bağımlılıklarının kendisi
+# derlenirken görülen özetlerini tutar. Boş bir derlemede yalnızca stat
+# yapılır; stat değişmişse içerik yeniden özetlenir, derleyici hiç çalışmaz.
+#
+# Güncellik kararı yalnızca nesnenin kendi özetleriyle verilir; dosya tablosu
+# bir stat önbelleğidir. Ortak tabloyla karşılaştırmak, bir başlığı yeniden
+# kaydeden nesnenin aynı başlığı kullanan ve henüz derlenmemiş (kesilmiş ya da
+# başka bir hata yüzünden engellenmiş) nesneleri güncel göstermesine yol açar.
+#
+# Biçim (little-endian):
+#   "PKDB" u32 sürüm, u32 dosya sayısı, u32 nesne sayısı
+#   dosya:  u16 yol uzunluğu, yol, i64 mtime_ns, i64 boyut, 16 bayt özet
+#   nesne:  u32 nesne dosyası indeksi, 16 bayt komut özeti, 16 bayt nesne
+#           özeti, u32 n, n x (u32 indeks, 16 bayt özet)
+#
+# "Nesne" girdileri arşiv ve bağlama çıktılarını da kapsar (girdileri açıkça verilir).
+# ----------------------------------------
+
+DEPDB_PATH = "build/pkgman.depdb"
+DEPS_MK_PATH = "build/deps.mk"
+MAGIC = b"PKDB"
+VERSION = 2
+DIGEST_SIZE = 16
+
+_HEADER = struct.Struct("<4sIII")
+_FILE = struct.Struct("<qq16s")
+_OBJECT = struct.Struct("<I16s16sI")
+_DEP = struct.Struct("<I16s")
+
+_lock = threading.Lock()
+
+# Son okunan/yazılan veritabanı: dosya o zamandan beri değişmediyse uzun ömürlü
+# süreçler (daemon) yeniden ayrıştırmaz
+_loaded = {}
+
+
+def empty():
+    return {"files": {}, "objects": {}, "dirty": False}
+
+
+def digest_file(path, chunk_size=1024 * 1024):
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def digest_command(cmd):
+    text = cmd if isinstance(cmd, str) else "\0".join(cmd)
+    return hashlib.blake2b(text.encode(), digest_size=DIGEST_SIZE).digest()
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def load(path=DEPDB_PATH):
+    if not os.path.exists(path):
+        return empty()
+    key = os.path.abspath(path)
+    signature = _signature(path)
+    cached = _loaded.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        magic, version, n_files, n_objects = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            return empty()
+        offset = _HEADER.size
+        paths = []
+        files = {}
+        for _ in range(n_files):
+            (length,) = struct.unpack_from("<H", data, offset)
+            offset += 2
+            p = data[offset:offset + length].decode()
+            offset += length
+            files[p] = _FILE.unpack_from(data, offset)
+            offset += _FILE.size
+            paths.append(p)
+        objects = {}
+        for _ in range(n_objects):
+            obj_index, cmd, own, n = _OBJECT.unpack_from(data, offset)
+            offset += _OBJECT.size
+            deps = {}
+            for _ in range(n):
+                index, digest = _DEP.unpack_from(data, offset)
+                offset += _DEP.size
+                deps[paths[index]] = digest
+            objects[paths[obj_index]] = {"cmd": cmd, "self": own, "deps": deps}
+    except (struct.error, IndexError, UnicodeDecodeError):
+        return empty()
+    db = {"files": files, "objects": objects, "dirty": False}
+    _loaded[key] = (signature, db)
+    return db
+
+
+def save(db, path=DEPDB_PATH):
+    with _lock:
+        # Yalnızca bir nesnenin kullandığı dosyalar yazılır
+        used = []
+        index = {}
+        for obj, entry in db["objects"].items():
+            for p in [obj] + list(entry["deps"]):
+                if p not in index and p in db["files"]:
+                    index[p] = len(used)
+                    used.append(p)
+
+        out = [_HEADER.pack(MAGIC, VERSION, len(used), 0)]
+        for p in used:
+            raw = p.encode()
+            out.append(struct.pack("<H", len(raw)) + raw + _FILE.pack(*db["files"][p]))
+        n_objects = 0
+        for obj, entry in db["objects"].items():
+            if obj not in index or any(d not in index for d in entry["deps"]):
+                continue
+            deps = b"".join(_DEP.pack(index[d], digest) for d, digest in entry["deps"].items())
+            out.append(_OBJECT.pack(index[obj], entry["cmd"], entry["self"], len(entry["deps"])) + deps)
+            n_objects += 1
+        out[0] = _HEADER.pack(MAGIC, VERSION, len(used), n_objects)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(out))
+        os.replace(tmp_path, path)
+        db["dirty"] = False
+        _loaded[os.path.abspath(path)] = (_signature(path), db)
+
+# ----------------------------------------
+# .d dosyalarından kayıt
+# ----------------------------------------
+
+def read_depfile(path):
+    """
+    Prerequisites of the first rule in a compiler-generated .d file.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        text = f.read().replace("\\\n", " ")
+    first = text.split("\n", 1)[0]
+    _, sep, prereqs = first.partition(": ")
+    if not sep:
+        return None
+    return prereqs.split()
+
+
+def _file_record(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, digest_file(path))
+
+
+def record(db, obj, cmd, depfile, extra=()):
+    """
+    Store obj's dependencies from the depfile the compiler just wrote, plus
+    `extra` inputs the depfile does not list (e.g. a precompiled header).
+    Returns False if the depfile is missing or unreadable.
+    """
+    deps = read_depfile(depfile)
+    if deps is None:
+        return False
+    return record_inputs(db, obj, cmd, deps + [p for p in extra if p not in deps])
+
+
+def record_inputs(db, output, cmd, inputs):
+    """
+    Store an explicit input list for output (archives, links).
+    """
+    try:
+        records = {p: _file_record(p) for p in [output] + list(inputs)}
+    except OSError:
+        return False
+    with _lock:
+        db["files"].update(records)
+        db["objects"][output] = {
+            "cmd": digest_command(cmd),
+            "self": records[output][2],
+            "deps": {p: records[p][2] for p in inputs},
+        }
+        db["dirty"] = True
+    return True
+
+
+def forget(db, obj):
+    with _lock:
+        if db["objects"].pop(obj, None) is not None:
+            db["dirty"] = True
+
+
+def current_digest(db, path):
+    """
+    Content digest of path as it is on disk now, re-hashed only when its
+    stat differs from the cached record. None if the file is missing.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    known = db["files"].get(path)
+    if known is not None and (st.st_mtime_ns, st.st_size) == known[:2]:
+        return known[2]
+    digest = digest_file(path)
+    with _lock:
+        db["files"][path] = (st.st_mtime_ns, st.st_size, digest)
+        db["dirty"] = True
+    return digest
+
+
+def is_current(db, obj, cmd):
+    """
+    None if obj is not in the database; otherwise whether obj, the command
+    and every dependency still match what obj was built from.
+    """
+    entry = db["objects"].get(obj)
+    if entry is None:
+        return None
+    if entry["cmd"] != digest_command(cmd):
+        return False
+    # Çıktının kendisi: kayıttan sonra başka bir şey yazmış olabilir
+    if current_digest(db, obj) != entry["self"]:
+        return False
+    return all(current_digest(db, p) == digest for p, digest in entry["deps"].items())
+
+# ----------------------------------------
+# make için dahil edilecek kurallar
+# ----------------------------------------
+
+def write_make_rules(db, path=DEPS_MK_PATH):
+    lines = []
+    headers = set()
+    for obj, entry in sorted(db["objects"].items()):
+        deps = list(entry["deps"])
+        lines.append(f"{obj}: {' '.join(deps)}")
+        headers.update(deps[1:])
+    # -MP gibi: silinen başlıklar make'i durdurmasın (kendi kuralı olanlar hariç)
+    lines += [f"{h}:" for h in sorted(headers - set(db["objects"]))]
+    content = "\n".join(lines) + "\n"
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            if f.read() == content:
+                return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
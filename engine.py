@@ -0,0 +1,478 @@
+import os
+import shlex
+import signal
+import threading
+import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from colorama import Fore, Style
+import settings
+import objcache
+import depdb
+import pkgcache
+import buildtrace as trace
+from tools import tool_argv
+from mkgen import (build_context, resolve_toolchain, compile_flags, link_flags, compile_units,
+                   target_pch, PCH_FLAGS, archive_flags, link_inputs, link_libraries,
+                   library_file, executable_file, target_dep_names, configuration_config,
+                   configuration_root)
+
+# ----------------------------------------
+# Yerel derleme motoru: build_context -> eylem grafiği -> paralel yürütme
+#
+# Her eylem bir sözlüktür:
+#   {"id", "kind": compile|pch|archive|link|shell|copy, "cmd", "inputs", "outputs",
+#    "deps": [eylem id], "label"}
+# Derleme eylemlerinde inputs[0] kaynak, geri kalanı (PCH) ek girdilerdir;
+# "compiler" derleyici türüdür (yapılandırmalar farklı derleyici kullanabilir).
+# copy, başka bir yapılandırmada aynı komutla derlenen nesneyi (inputs[0])
+# süreç içinde kopyalar; cmd o nesnenin bu yoldaki derleme komutudur.
+# ----------------------------------------
+
+KIND_STYLE = {
+    "compile": (Fore.CYAN, "CC", "Compiling"),
+    "archive": (Fore.MAGENTA, "AR", "Archiving"),
+    "link": (Fore.YELLOW, "LD", "Linking"),
+    "pch": (Fore.CYAN, "PCH", "Precompiling"),
+    "shell": (Fore.WHITE, "SHELL", "Running"),
+    "copy": (Fore.BLUE, "CP", "Sharing"),
+}
+
+_print_lock = threading.Lock()
+_pools = {}
+
+# Kesilen bir derlemede çalışan alt süreçler öldürülür, yenileri başlatılmaz.
+# Havuz süreç boyunca yaşadığı için (watch, daemon) bunu kendiliğinden yapmaz.
+_live = set()
+_live_lock = threading.Lock()
+_cancelled = threading.Event()
+
+
+def plan_actions(root="build", config=None):
+    """
+    Turn the evaluated build_context into an ordered {id: action} graph.
+    `config` replaces build_context["config"] (named configurations).
+    """
+    proj_name = build_context["project"].get("name", "default")
+    config = build_context["config"] if config is None else config
+    targets = build_context["targets"]
+    functions = build_context["functions"]
+
+    toolchain = resolve_toolchain(config)
+    compiler = build_context["toolchain_profile"]["features"]["kind"]
+    cflags = compile_flags(config)
+    ldflags = link_flags(config)
+
+    actions = {}
+
+    def add(action):
+        actions[action["id"]] = action
+        return action["id"]
+
+    # Fonksiyon (isimli shell) adımları; bağımlılıkları başka fonksiyonlar olabilir
+    for fname, info in functions.items():
+        add({
+            "id": f"shell:{fname}",
+            "kind": "shell",
+            "cmd": info["cmd"],
+            "inputs": [d for d in info.get("deps", []) if d not in functions],
+            "outputs": [],
+            "deps": [f"shell:{d}" for d in info.get("deps", []) if d in functions],
+            "label": fname,
+        })
+
+    def compile_actions(target):
+        # Fonksiyon bağımlılıkları derlemeden önce çalışır (make'teki gibi)
+        step_deps = [f"shell:{d}" for d in target_dep_names(target) if d in functions]
+        pch_flags, pch_inputs = [], []
+        pch_info = target_pch(proj_name, target, root)
+        if pch_info is not None:
+            pch_flags = pch_info["flags"]
+        if pch_info is not None and pch_info["output"]:
+            pch_id = f"pch:{pch_info['output']}"
+            if pch_id not in actions:
+                add({
+                    "id": pch_id,
+                    "kind": "pch",
+                    "cmd": tool_argv(toolchain["CC"]) + cflags + PCH_FLAGS + [pch_info["stub"], "-o", pch_info["output"]],
+                    "inputs": [pch_info["stub"]],
+                    "outputs": [pch_info["output"]],
+                    "deps": list(step_deps),
+                    "label": pch_info["header"],
+                })
+            pch_inputs = [pch_info["output"]]
+            step_deps = step_deps + [pch_id]
+
+        ids = []
+        for src, obj, extra in compile_units(proj_name, target, root, config):
+            ids.append(add({
+                "id": f"compile:{obj}",
+                "kind": "compile",
+                "cmd": tool_argv(toolchain["CC"]) + cflags + extra + pch_flags + ["-c", src, "-o", obj],
+                "inputs": [src] + pch_inputs,
+                "outputs": [obj],
+                "deps": list(step_deps),
+                "label": src,
+                "compiler": compiler,
+            }))
+        return ids
+
+    ar_flags = archive_flags(config)
+    for target in targets:
+        if target["type"] != "library":
+            continue
+        obj_ids = compile_actions(target)
+        libfile = library_file(target, root)
+        objs = [actions[i]["outputs"][0] for i in obj_ids]
+        add({
+            "id": f"archive:{libfile}",
+            "kind": "archive",
+            "cmd": tool_argv(toolchain["AR"]) + [ar_flags, libfile] + objs,
+            "inputs": objs,
+            "outputs": [libfile],
+            "deps": obj_ids,
+            "label": libfile,
+        })
+
+    for target in targets:
+        if target["type"] != "executable":
+            continue
+        obj_ids = compile_actions(target)
+        bin_path = executable_file(target, root)
+        objs = [actions[i]["outputs"][0] for i in obj_ids]
+        lib_ids = [f"archive:{library_file(lib, root)}" for lib in link_libraries(target)]
+        libs = [actions[i]["outputs"][0] for i in lib_ids]
+        if ar_flags == "rcsT":
+            # İnce arşiv yalnızca üye yollarını tutar: aynı boyutta değişen bir
+            # nesne arşivi değiştirmez, bağlamayı üyelerin kendisi tetiklemeli
+            libs += [member for i in lib_ids for member in actions[i]["inputs"]]
+        add({
+            "id": f"link:{bin_path}",
+            "kind": "link",
+            "cmd": tool_argv(toolchain["LD"]) + link_inputs(target, objs, root) + ["-o", bin_path] + ldflags,
+            "inputs": objs + libs,
+            "outputs": [bin_path],
+            "deps": obj_ids + lib_ids,
+            "label": bin_path,
+        })
+
+    return actions
+
+
+def plan_configurations(names, root="build"):
+    """
+    One graph for several named configurations, each under its own output
+    root, so they share one scheduler. Shell steps appear once; a compile
+    whose command differs from an earlier configuration's only by the
+    object path becomes a copy of that object.
+    """
+    actions = {}
+    compiled = {}
+    for name in names:
+        for aid, action in plan_actions(configuration_root(name, root), configuration_config(name)).items():
+            if aid in actions:
+                continue
+            if action["kind"] == "compile":
+                obj = action["outputs"][0]
+                key = tuple("\0" if part == obj else part for part in action["cmd"])
+                if key in compiled:
+                    first = actions[compiled[key]]["outputs"][0]
+                    action = dict(action, kind="copy", inputs=[first], deps=[compiled[key]], label=obj)
+                else:
+                    compiled[key] = aid
+            actions[aid] = action
+    return actions
+
+# ----------------------------------------
+# Güncellik kontrolü: derleme adımları bağımlılık veritabanından, diğerleri mtime ile
+# ----------------------------------------
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _newer_than_outputs(action, inputs):
+    out_times = [_mtime(o) for o in action["outputs"]]
+    if not out_times or None in out_times:
+        return True
+    oldest = min(out_times)
+    for path in inputs:
+        mtime = _mtime(path)
+        if mtime is None or mtime > oldest:
+            return True
+    return False
+
+
+def is_up_to_date(action, db):
+    """
+    Every step but shell functions is checked against the dependency
+    database, so a changed command line also reruns it.
+    """
+    if action["kind"] == "shell":
+        return False
+
+    out = action["outputs"][0]
+    current = depdb.is_current(db, out, action["cmd"])
+    if current is not None:
+        return current
+    # Veritabanında yok (ör. make ile derlenmiş): .d dosyası ve mtime ile karar ver
+    if action["kind"] in ("compile", "pch", "copy"):
+        depfile = objcache.depfile_path(out)
+        deps = depdb.read_depfile(depfile)
+        if deps is None or _newer_than_outputs(action, action["inputs"] + deps):
+            return False
+        return depdb.record(db, out, action["cmd"], depfile, extra=_extra_inputs(action))
+    if _newer_than_outputs(action, action["inputs"]):
+        return False
+    return depdb.record_inputs(db, out, action["cmd"], action["inputs"])
+
+# ----------------------------------------
+# Yürütme
+# ----------------------------------------
+
+def format_command(action):
+    cmd = action["cmd"]
+    return cmd if isinstance(cmd, str) else " ".join(shlex.quote(c) for c in cmd)
+
+
+def _report(action, output, ok):
+    color, tag, verb = KIND_STYLE[action["kind"]]
+    with _print_lock:
+        print(f"{color}[{tag}]{Style.RESET_ALL} {verb} {action['label']}")
+        if output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        if not ok:
+            print(f"{Fore.RED}[FAILED]{Style.RESET_ALL} {format_command(action)}")
+
+
+def _extra_inputs(action):
+    """
+    Inputs of a compile-like action that its depfile does not list.
+    """
+    return action["inputs"] if action["kind"] == "copy" else action["inputs"][1:]
+
+
+def _record(action, db):
+    out = action["outputs"][0]
+    if action["kind"] in ("compile", "pch", "copy"):
+        ok = depdb.record(db, out, action["cmd"], objcache.depfile_path(out), extra=_extra_inputs(action))
+    else:
+        ok = depdb.record_inputs(db, out, action["cmd"], action["inputs"])
+    if not ok:
+        depdb.forget(db, out)
+
+
+def execute_action(action, db):
+    """
+    Run one action with its output captured, then print it as one block so
+    parallel jobs never interleave. Returns (ok, ran).
+    """
+    if is_up_to_date(action, db):
+        return True, False
+    if action["kind"] == "copy":
+        return _share(action, db), True
+
+    start = trace.now()
+    cache_key = None
+    if action["kind"] == "compile" and settings.get("objcache"):
+        # gcc -E PCH'yi yok sayıp başlığı açar; diğer derleyicilerde PCH içeriği anahtara girer
+        extra = action["inputs"][1:] if action["compiler"] != "gcc" else []
+        cache_key = objcache.compute_key(action["cmd"], action["inputs"][0], extra)
+        if cache_key and objcache.restore(cache_key, action["outputs"][0]):
+            _record(action, db)
+            trace.add(action["label"], action["kind"], start, trace.now(), id=action["id"], cache="hit")
+            with _print_lock:
+                print(f"{Fore.BLUE}[CACHE]{Style.RESET_ALL} Restored {action['label']}")
+            return True, True
+
+    stale = list(action["outputs"])
+    if action["kind"] == "compile":
+        stale.append(objcache.dwo_path(action["outputs"][0]))
+    for out in stale:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        # Eski çıktıyı sil: ar rcs eski üyeleri tutar, önbellekten gelen
+        # hardlink'ler de yerinde üzerine yazılmamalı
+        if os.path.exists(out):
+            os.remove(out)
+
+    result = _run_command(action["cmd"])
+    if result is None or _cancelled.is_set():
+        # Kesildi: yarım kalan çıktıyı bırakma, raporlama
+        for out in action["outputs"]:
+            if os.path.exists(out):
+                os.remove(out)
+        if action["outputs"]:
+            depdb.forget(db, action["outputs"][0])
+        return False, result is not None
+    ok = result.returncode == 0
+    if not ok:
+        for out in action["outputs"]:
+            if os.path.exists(out):
+                os.remove(out)
+        if action["outputs"]:
+            depdb.forget(db, action["outputs"][0])
+    elif action["outputs"]:
+        _record(action, db)
+        if cache_key:
+            objcache.store(cache_key, action["outputs"][0])
+    trace.add(action["label"], action["kind"], start, trace.now(), id=action["id"],
+              cmd=format_command(action), exit_code=result.returncode,
+              cache="miss" if cache_key else None)
+    _report(action, result.stdout, ok)
+    return ok, True
+
+
+def _share(action, db):
+    """
+    Copy an object compiled by another configuration, with its depfile
+    (retargeted) and split DWARF, and record it like a compile.
+    """
+    start = trace.now()
+    src, out = action["inputs"][0], action["outputs"][0]
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    pkgcache.clone_file(src, out)
+    with open(objcache.depfile_path(src), "r") as f:
+        deps = f.read()
+    with open(objcache.depfile_path(out), "w") as f:
+        f.write(deps.replace(f"{src}:", f"{out}:", 1))
+    if os.path.exists(objcache.dwo_path(src)):
+        pkgcache.clone_file(objcache.dwo_path(src), objcache.dwo_path(out))
+    elif os.path.exists(objcache.dwo_path(out)):
+        os.remove(objcache.dwo_path(out))
+    _record(action, db)
+    trace.add(action["label"], action["kind"], start, trace.now(), id=action["id"])
+    _report(action, "", True)
+    return True
+
+
+def _run_command(cmd):
+    """
+    Run cmd with its output captured, registered so that cancel() can kill
+    it. None if the build was already cancelled.
+    """
+    with _live_lock:
+        if _cancelled.is_set():
+            return None
+        # Kendi süreç grubunda: kabuk adımlarının alt süreçleri de öldürülebilsin
+        proc = subprocess.Popen(cmd, shell=isinstance(cmd, str), stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, start_new_session=True)
+        _live.add(proc)
+    try:
+        stdout, _ = proc.communicate()
+    finally:
+        with _live_lock:
+            _live.discard(proc)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout)
+
+
+def cancel(running):
+    """
+    Stop an interrupted run: drop queued actions, kill running commands and
+    wait until every submitted action has returned.
+    """
+    with _live_lock:
+        _cancelled.set()
+        procs = list(_live)
+    for future in running:
+        future.cancel()
+    for proc in procs:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (OSError, AttributeError):
+            proc.kill()
+    wait(running)
+
+
+def worker_pool(jobs):
+    """
+    Thread pool with `jobs` workers, kept for the life of the process so
+    repeated builds (watch, daemon) reuse the same threads.
+    """
+    if jobs not in _pools:
+        _pools[jobs] = ThreadPoolExecutor(max_workers=jobs)
+    return _pools[jobs]
+
+
+def run_actions(actions, jobs=None, keep_going=False, db_path=depdb.DEPDB_PATH, db=None):
+    """
+    Run the graph on a pool of `jobs` workers (CPU count by default).
+    Without keep_going nothing new starts after the first failure; with it,
+    only actions downstream of a failure are skipped. A loaded `db` is used
+    as is instead of reading db_path. Returns True on success.
+    """
+    jobs = max(int(jobs or os.cpu_count() or 1), 1)
+    run_start = trace.now()
+    if db is None:
+        db = depdb.load(db_path)
+    pending = {aid: set(a["deps"]) for aid, a in actions.items()}
+    dependents = defaultdict(list)
+    for aid, action in actions.items():
+        for dep in action["deps"]:
+            dependents[dep].append(aid)
+
+    ready = [aid for aid, deps in pending.items() if not deps]
+    running = {}
+    failed = []
+    blocked = set()
+    ran = 0
+    stop = False
+
+    def block(aid):
+        for d in dependents[aid]:
+            if d not in blocked:
+                blocked.add(d)
+                block(d)
+
+    pool = worker_pool(jobs)
+    _cancelled.clear()
+    try:
+        while ready or running:
+            while ready and not stop:
+                aid = ready.pop(0)
+                running[pool.submit(execute_action, actions[aid], db)] = aid
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                aid = running.pop(future)
+                try:
+                    ok, did_run = future.result()
+                except Exception as e:
+                    _report(actions[aid], f"{e}\n", False)
+                    ok, did_run = False, True
+                ran += did_run
+                if not ok:
+                    failed.append(aid)
+                    block(aid)
+                    stop = stop or not keep_going
+                    continue
+                for d in dependents[aid]:
+                    pending[d].discard(aid)
+                    if not pending[d] and d not in blocked:
+                        ready.append(d)
+    except KeyboardInterrupt:
+        # Bitmiş adımlar kaydedilir; kesilenler bir sonraki derlemede yeniden çalışır
+        cancel(running)
+        if db["dirty"]:
+            depdb.save(db, db_path)
+        raise
+
+    if db["dirty"]:
+        depdb.save(db, db_path)
+        depdb.write_make_rules(db, os.path.join(os.path.dirname(db_path), "deps.mk"))
+    if trace.enabled():
+        trace.add("run", "engine", run_start, trace.now(), jobs=jobs)
+        trace.summarize(actions, trace.now() - run_start)
+
+    if failed:
+        print(f"{Fore.RED}[FAILED]{Style.RESET_ALL} {len(failed)} step(s) failed"
+              + (f", {len(blocked)} skipped" if blocked else ""))
+        return False
+    if ran == 0:
+        print(f"{Fore.BLUE}[SKIP]{Style.RESET_ALL} Everything up to date.")
+    else:
+        print(f"{Fore.GREEN}[DONE]{Style.RESET_ALL} {ran} step(s) run, {len(actions) - ran} up to date.")
+    return True
@@ -1,9 +1,35 @@
 import os
+import sys
+import time
+import threading
 import platform
 import requests
 import json
 import subprocess
 import shutil
+import hashlib
+import tarfile
+import zipfile
+import zlib
+import lzma
+import tempfile
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+import settings
+import registry
+from pkgcache import format_size
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Yeniden denenebilir HTTP durumları
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Akışla indirme parça boyutu; bellek kullanımı dosya boyutundan bağımsız kalır
+CHUNK_SIZE = 64 * 1024
 
 # ----------------------------------------
 # Platform Algılama
@@ -17,91 +43,706 @@ def detect_platform():
         "windows": "windows"
     }.get(sys, "unknown")
 
+def detect_arch():
+    machine = platform.machine().lower()
+    return {
+        "x86_64": "x86_64",
+        "amd64": "x86_64",
+        "x64": "x86_64",
+        "arm64": "arm64",
+        "aarch64": "arm64",
+        "armv8l": "arm64",
+        "i386": "x86",
+        "i686": "x86",
+    }.get(machine, machine or "unknown")
+
+def host_platform():
+    # Platform anahtarı: işletim sistemi + CPU mimarisi, örn. "macos-arm64"
+    return f"{detect_platform()}-{detect_arch()}"
+
 # ----------------------------------------
-# package.json'dan paket klasörü bilgisi alma
+# Paylaşılan HTTP oturumu (bağlantı havuzu)
+# ----------------------------------------
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Paketler de eşzamanlı indirildiği için havuz ikisinin çarpımı kadar
+            pool_size = max(int(settings.get("jobs")) * int(settings.get("install_jobs")), 1)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+def _version_key(version):
+    return [int(p) if p.isdigit() else p for p in version.replace("-", ".").split(".")]
+
 # ----------------------------------------
+# package.json indeksi: süreç içi tek ayrıştırma + disk önbelleği (TTL, ETag)
+# ----------------------------------------
+
+_index_memo = {}
+_index_lock = threading.Lock()
+
+class IndexUnavailable(Exception):
+    pass
+
+def _index_cache_paths(raw_url):
+    digest = hashlib.sha256(raw_url.encode()).hexdigest()[:16]
+    base = os.path.join(settings.cache_dir(), "index", digest)
+    return base + ".json", base + ".meta.json"
+
+def _write_atomic(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def _load_index(raw_url):
+    body_path, meta_path = _index_cache_paths(raw_url)
+    has_body = os.path.exists(body_path)
+    meta = {}
+    if has_body and os.path.exists(meta_path):
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+
+    def cached():
+        with open(body_path, "r") as f:
+            return json.load(f)
+
+    if settings.get("offline"):
+        if not has_body:
+            raise IndexUnavailable(f"[ERROR] No cached package index for {raw_url} (offline mode).")
+        return cached()
+
+    if has_body and time.time() - meta.get("fetched", 0) < settings.get("index_ttl"):
+        return cached()
+
+    headers = {}
+    if has_body and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if has_body and meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
 
-def get_package_info(package_name, version, repo_user, repo_name, branch="main"):
-    raw_url = f"https://raw.githubusercontent.com/{repo_user}/{repo_name}/{branch}/package.json"
     print(f"[INFO] Fetching package index from {raw_url}")
-    
-    response = requests.get(raw_url)
+    try:
+        response = get_session().get(raw_url, headers=headers, timeout=settings.get("timeout"))
+    except requests.RequestException as e:
+        if not has_body:
+            raise
+        print(f"[WARN] {e}; using cached package index")
+        return cached()
+
+    if response.status_code == 304 and has_body:
+        meta["fetched"] = time.time()
+        _write_atomic(meta_path, json.dumps(meta))
+        return cached()
     response.raise_for_status()
 
     metadata = json.loads(response.text)
+    _write_atomic(body_path, response.text)
+    _write_atomic(meta_path, json.dumps({
+        "url": raw_url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched": time.time(),
+    }))
+    return metadata
+
+def fetch_index_url(raw_url):
+    with _index_lock:
+        if raw_url not in _index_memo:
+            _index_memo[raw_url] = _load_index(raw_url)
+        return _index_memo[raw_url]
+
+def fetch_package_index(repo_user="CBatu", repo_name="pkgman", branch="main"):
+    return fetch_index_url(f"https://raw.githubusercontent.com/{repo_user}/{repo_name}/{branch}/package.json")
+
+# ----------------------------------------
+# package.json'dan paket klasörü bilgisi alma
+# ----------------------------------------
+
+class PackageNotFound(Exception):
+    pass
+
+# Bu süreçte ulaşılamayan kayıt defterleri tekrar denenmez
+_unavailable_registries = set()
+
+def _lookup_in_index(metadata, package_name, version, platform_key):
     packages = metadata.get("packages", {})
     
     if package_name not in packages:
-        raise Exception(f"[ERROR] Package '{package_name}' not found.")
+        raise PackageNotFound(f"[ERROR] Package '{package_name}' not found.")
 
     versions = packages[package_name]
+    if version in (None, "latest") and versions:
+        version = max(versions, key=_version_key)
     if version not in versions:
-        raise Exception(f"[ERROR] Version '{version}' not found for package '{package_name}'.")
+        raise PackageNotFound(f"[ERROR] Version '{version}' not found for package '{package_name}'.")
+
+    # Önce "macos-arm64" gibi tam anahtar, yoksa yalnızca işletim sistemi ("macos")
+    os_key, _, arch = platform_key.partition("-")
+    entry = None
+    for key in ([platform_key, os_key] if arch else [platform_key]):
+        entry = versions[version].get(key)
+        if entry:
+            break
+
+    if not entry:
+        raise PackageNotFound(f"[ERROR] Platform '{platform_key}' not supported for '{package_name} {version}'.")
+
+    # Eski biçim: "macos": "<klasör>"; yeni biçim: {"folder", "archive", "sha256"}
+    if isinstance(entry, str):
+        entry = {"folder": entry}
+
+    info = dict(entry)
+    # Mimariye özgü alanlar: "arch": {"arm64": {"exclude": [...]}} (arşiv/klasör de olabilir)
+    arch_entry = info.pop("arch", {}).get(arch) if arch else None
+    if arch_entry:
+        info.update(arch_entry)
+    info.update({"name": package_name, "version": version, "platform": platform_key})
+
+    # Sürüm düzeyindeki bağımlılıklar, platforma özgü olanlarla birleştirilir
+    dependencies = dict(versions[version].get("dependencies", {}))
+    dependencies.update(entry.get("dependencies", {}))
+    info["dependencies"] = dependencies
+    return info
+
+def resolve_package(package_name, version, repo_user=None, repo_name=None, branch="main", platform_key=None):
+    """
+    Look the package up in each configured registry in order (or only in
+    the given GitHub repo) and return the first match. info["registry"]
+    names the registry the files must be fetched from.
+    """
+    if repo_user:
+        registries = [registry.GitHubRegistry(repo_user, repo_name, branch)]
+    else:
+        registries = registry.configured_registries()
+    platform_key = platform_key or host_platform()
 
-    platform_key = detect_platform()
-    folder = versions[version].get(platform_key)
+    error = None
+    for reg in registries:
+        if reg.url in _unavailable_registries:
+            continue
+        try:
+            metadata = reg.fetch_index()
+            info = _lookup_in_index(metadata, package_name, version, platform_key)
+        except PackageNotFound as e:
+            error = error or e
+            continue
+        except (IndexUnavailable, requests.RequestException, OSError, ValueError) as e:
+            print(f"[WARN] Registry {reg.url} unavailable: {e}")
+            _unavailable_registries.add(reg.url)
+            error = error or e
+            continue
+        info["registry"] = reg.url
+        return info
 
-    if not folder:
-        raise Exception(f"[ERROR] Platform '{platform_key}' not supported for '{package_name} {version}'.")
+    raise Exception(str(error) if error else f"[ERROR] No registries configured.")
 
-    return folder
+def get_package_info(package_name, version, repo_user=None, repo_name=None, branch="main"):
+    return package_dir(resolve_package(package_name, version, repo_user, repo_name, branch))
 
 # ----------------------------------------
-# GitHub API ile klasördeki tüm dosyaları listele (recursive)
+# GitHub API başlıkları
 # ----------------------------------------
 
-def list_folder_files_from_github(user, repo, branch, folder_path):
-    api_url = f"https://api.github.com/repos/{user}/{repo}/contents/{folder_path}?ref={branch}"
+def _github_headers():
     headers = {'Accept': 'application/vnd.github.v3+json'}
-    
-    response = requests.get(api_url, headers=headers)
+    token = settings.get("github_token") or os.environ.get("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+# ----------------------------------------
+# Tek istekle recursive ağaç listeleme (git/trees), tree SHA ile önbellekli
+# ----------------------------------------
+
+_listing_lock = threading.Lock()
+
+def _listing_cache_path():
+    return os.path.join(settings.cache_dir(), "listings.json")
+
+def _load_listing_cache():
+    path = _listing_cache_path()
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except ValueError:
+            pass
+    return {"refs": {}, "trees": {}}
+
+def _save_listing_cache(cache):
+    path = _listing_cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+def _walk_tree(user, repo, sha, prefix):
+    # recursive=1 olmadan tek ağaç; alt ağaçlar SHA ile ayrı ayrı istenir
+    api_url = f"https://api.github.com/repos/{user}/{repo}/git/trees/{sha}"
+    response = get_session().get(api_url, headers=_github_headers(), timeout=settings.get("timeout"))
     response.raise_for_status()
-    items = response.json()
-    
     file_paths = []
-    for item in items:
-        if item["type"] == "file":
-            file_paths.append(item["path"])
-        elif item["type"] == "dir":
-            # Recursive klasör tarama
-            file_paths.extend(list_folder_files_from_github(user, repo, branch, item["path"]))
-    
+    for item in response.json().get("tree", []):
+        path = f"{prefix}/{item['path']}"
+        if item["type"] == "blob":
+            file_paths.append(path)
+        elif item["type"] == "tree":
+            file_paths.extend(_walk_tree(user, repo, item["sha"], path))
     return file_paths
 
+def _is_commit_sha(ref):
+    return len(ref) == 40 and all(c in "0123456789abcdef" for c in ref.lower())
+
+def list_folder_files_tree(user, repo, branch, folder_path):
+    ref_key = f"{user}/{repo}@{branch}:{folder_path}"
+    with _listing_lock:
+        cache = _load_listing_cache()
+    ref = cache["refs"].get(ref_key)
+    cached = cache["trees"].get(ref["sha"]) if ref else None
+
+    # Commit SHA'ya sabitlenmiş sürüm değişmez: hiç istek atma
+    if cached is not None and _is_commit_sha(branch):
+        return cached
+
+    headers = _github_headers()
+    if cached is not None and ref.get("etag"):
+        headers["If-None-Match"] = ref["etag"]
+
+    api_url = f"https://api.github.com/repos/{user}/{repo}/git/trees/{branch}:{folder_path}?recursive=1"
+    response = get_session().get(api_url, headers=headers, timeout=settings.get("timeout"))
+    if response.status_code == 304 and cached is not None:
+        return cached
+    response.raise_for_status()
+    data = response.json()
+
+    # Çok büyük ağaçlarda GitHub listeyi keser; alt ağaçları tek tek tara
+    if data.get("truncated"):
+        file_paths = _walk_tree(user, repo, data["sha"], folder_path)
+    else:
+        file_paths = [f"{folder_path}/{item['path']}" for item in data.get("tree", []) if item["type"] == "blob"]
+
+    with _listing_lock:
+        cache = _load_listing_cache()
+        cache["trees"][data["sha"]] = file_paths
+        cache["refs"][ref_key] = {"sha": data["sha"], "etag": response.headers.get("ETag")}
+        _save_listing_cache(cache)
+
+    return file_paths
+
+# ----------------------------------------
+# Yerel depo kopyasından listeleme (çevrimdışı test için)
+# ----------------------------------------
+
+def list_folder_files_local(user, repo, branch, folder_path):
+    return walk_folder(settings.get("local_root"), folder_path)
+
+def walk_folder(root, folder_path):
+    base = os.path.join(root, folder_path)
+    if not os.path.isdir(base):
+        raise Exception(f"[ERROR] Folder '{folder_path}' not found under {root}.")
+
+    file_paths = []
+    for dirpath, dirnames, filenames in os.walk(base):
+        dirnames.sort()
+        for name in sorted(filenames):
+            rel = os.path.relpath(os.path.join(dirpath, name), root)
+            file_paths.append(rel.replace(os.sep, "/"))
+    return file_paths
+
+# ----------------------------------------
+# Listeleme arka ucu seçimi
+# ----------------------------------------
+
+LISTING_BACKENDS = {
+    "tree": list_folder_files_tree,
+    "local": list_folder_files_local,
+}
+
+def register_listing_backend(name, func):
+    """
+    func(user, repo, branch, folder_path) -> list of repo-relative file paths
+    """
+    LISTING_BACKENDS[name] = func
+
+def list_package_files(user, repo, branch, folder_path, backend=None):
+    backend = backend or settings.get("listing_backend")
+    if backend not in LISTING_BACKENDS:
+        raise Exception(f"[ERROR] Unknown listing backend '{backend}'.")
+    return LISTING_BACKENDS[backend](user, repo, branch, folder_path)
+
 # ----------------------------------------
 # Tek bir dosyayı indir ve .cache içine kaydet
 # ----------------------------------------
 
-def download_file_from_repo(user, repo, branch, file_path, save_root=".cache"):
-    url = f"https://raw.githubusercontent.com/{user}/{repo}/{branch}/{file_path}"
-    local_path = os.path.join(save_root, file_path)
-    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+class _PartialDownload(Exception):
+    pass
 
-    print(f"[↓] {file_path}")
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(local_path, "wb") as f:
-            f.write(response.content)
-    else:
-        raise Exception(f"[ERROR] Failed to download {file_path}: HTTP {response.status_code}")
+class ChecksumMismatch(Exception):
+    pass
+
+class DownloadFailed(Exception):
+    pass
+
+def _hash_existing(path, h):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+
+def _stream_once(session, url, part_path):
+    """
+    One GET attempt into part_path, resuming with a Range request when a
+    partial file exists. Returns the sha256 hasher of the complete file.
+    """
+    h = hashlib.sha256()
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    # Content-Length ve Range sıkıştırılmış gösterime göredir; dosyayı olduğu
+    # gibi iste ki bayt sayısı ve kaldığı yerden devam tutarlı kalsın
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+
+    with session.get(url, headers=headers, stream=True, timeout=settings.get("timeout")) as response:
+        # identity'yi yok sayıp sıkıştıran sunucunun 206 aralığı açılmış dosyaya uymaz
+        encoded = response.headers.get("Content-Encoding", "identity").lower() not in ("", "identity")
+        resumed = (offset > 0 and response.status_code == 206 and not encoded
+                   and response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"))
+        if offset and (response.status_code == 416 or (response.status_code == 206 and not resumed)):
+            # Sunucu aralığı kabul etmedi ya da başka bir aralık gönderdi: yarım
+            # dosya geçersiz, Range olmadan hemen baştan başla
+            os.remove(part_path)
+            response.close()
+            return _stream_once(session, url, part_path)
+        if response.status_code not in (200, 206):
+            return response
+
+        if resumed:
+            _hash_existing(part_path, h)
+            mode = "ab"
+        else:
+            offset = 0
+            mode = "wb"
+
+        expected = response.headers.get("Content-Length")
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                h.update(chunk)
+        # Açılmış değil, bağlantıdan okunan bayt sayısı
+        received = response.raw.tell()
+
+        if expected is not None and received != int(expected):
+            raise _PartialDownload(f"short read ({offset + received} bytes)")
+    return h
+
+def stream_download(url, local_path, expected_sha256=None, session=None, retries=None):
+    """
+    Stream url to local_path in CHUNK_SIZE pieces with resume and retry.
+    The file is written to <local_path>.part and renamed into place only
+    after its sha256 is verified. Returns the hex digest.
+    """
+    os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+    part_path = local_path + ".part"
+    session = session or get_session()
+    retries = settings.get("retries") if retries is None else retries
+    backoff = settings.get("backoff")
+
+    for attempt in range(retries + 1):
+        try:
+            result = _stream_once(session, url, part_path)
+        except (requests.RequestException, _PartialDownload) as e:
+            error = str(e)
+        else:
+            if not isinstance(result, requests.Response):
+                digest = result.hexdigest()
+                if expected_sha256 and digest != expected_sha256:
+                    os.remove(part_path)
+                    raise ChecksumMismatch(f"[ERROR] Checksum mismatch for {url}: expected {expected_sha256}, got {digest}")
+                os.replace(part_path, local_path)
+                return digest
+            error = f"HTTP {result.status_code}"
+            if result.status_code not in RETRY_STATUSES:
+                break
+        if attempt < retries:
+            time.sleep(backoff * (2 ** attempt))
+
+    raise DownloadFailed(f"[ERROR] Failed to download {url}: {error}")
+
+# ----------------------------------------
+# İlerleme satırı
+# ----------------------------------------
+
+class _Progress:
+    def __init__(self, total, label=""):
+        self.total = total
+        self.label = f"{label}: " if label else ""
+        self.done = 0
+        self.bytes = 0
+        self.start = time.monotonic()
+        self.lock = threading.Lock()
+        self.tty = sys.stdout.isatty()
+
+    def advance(self, nbytes):
+        with self.lock:
+            self.done += 1
+            self.bytes += nbytes
+            if self.tty:
+                print(f"\r{self.line()}", end="", flush=True)
+
+    def line(self):
+        elapsed = max(time.monotonic() - self.start, 1e-6)
+        return (f"[↓] {self.label}{self.done}/{self.total} files, {format_size(self.bytes)} "
+                f"({format_size(self.bytes / elapsed)}/s)")
+
+    def finish(self):
+        print(f"\r{self.line()}" if self.tty else self.line())
 
-    return local_path
+# ----------------------------------------
+# Platform/mimari dosya alt kümesi (include/exclude globları)
+# ----------------------------------------
+
+def package_file_filter(info):
+    """
+    Returns keep(rel_path) for the entry's include/exclude globs.
+    """
+    include = info.get("include") or []
+    exclude = info.get("exclude") or []
+
+    def keep(rel):
+        if include and not any(fnmatch(rel, g) for g in include):
+            return False
+        return not any(fnmatch(rel, g) for g in exclude)
+
+    return keep
+
+# ----------------------------------------
+# Tek arşivle paket indirme (tar.gz / tar.zst / tar.xz / zip), akışla açma
+# ----------------------------------------
+
+ARCHIVE_TAR_MODES = {
+    ".tar.gz": "r|gz",
+    ".tgz": "r|gz",
+    ".tar.xz": "r|xz",
+    ".tar.bz2": "r|bz2",
+    ".tar": "r|",
+}
+
+class UnsupportedArchive(Exception):
+    pass
+
+# Bunlarda dosya dosya indirmeye geçilir; sağlama hatası ve güvensiz yol ise durdurur
+ARCHIVE_FALLBACK_ERRORS = (DownloadFailed, UnsupportedArchive, requests.RequestException, OSError, EOFError,
+                           tarfile.TarError, zipfile.BadZipFile, lzma.LZMAError, zlib.error)
+if zstandard is not None:
+    ARCHIVE_FALLBACK_ERRORS += (zstandard.ZstdError,)
+
+def package_dir(info):
+    """
+    Local directory name of a package: its registry folder, or
+    <name>-<version> for entries that only ship an archive.
+    """
+    return info.get("folder") or f"{info['name']}-{info['version']}"
+
+class _HashingReader:
+    def __init__(self, raw):
+        self.raw = raw
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, n=-1):
+        data = self.raw.read(n)
+        self.hash.update(data)
+        self.size += len(data)
+        return data
+
+    def drain(self):
+        while self.read(CHUNK_SIZE):
+            pass
+
+def _archive_member_path(name, folder):
+    name = name.replace("\\", "/")
+    parts = [p for p in name.split("/") if p not in ("", ".")]
+    if name.startswith("/") or ".." in parts:
+        raise Exception(f"[ERROR] Unsafe path in archive: {name}")
+    if parts and parts[0] == folder:
+        parts = parts[1:]
+    return "/".join(parts)
+
+def _write_member(src, target, mode, hashes, rel):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    h = hashlib.sha256()
+    with open(target, "wb") as f:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            f.write(chunk)
+            h.update(chunk)
+    os.chmod(target, mode & 0o777 or 0o644)
+    hashes[rel] = h.hexdigest()
+
+def _extract_tar_stream(fileobj, mode, dest, folder, hashes, keep):
+    with tarfile.open(fileobj=fileobj, mode=mode) as tar:
+        for member in tar:
+            rel = _archive_member_path(member.name, folder)
+            if not rel or (not member.isdir() and not keep(rel)):
+                continue
+            if member.isdir():
+                os.makedirs(os.path.join(dest, rel), exist_ok=True)
+            elif member.isfile():
+                _write_member(tar.extractfile(member), os.path.join(dest, rel), member.mode, hashes, rel)
+            else:
+                print(f"[WARN] Skipping non-regular archive member: {member.name}")
+
+def _extract_zip(path, dest, folder, hashes, keep):
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            rel = _archive_member_path(info.filename, folder)
+            if not rel or info.is_dir() or not keep(rel):
+                continue
+            mode = (info.external_attr >> 16) & 0o777
+            with zf.open(info) as src:
+                _write_member(src, os.path.join(dest, rel), mode, hashes, rel)
+
+def download_package_archive(info, save_root=".cache", hashes=None):
+    """
+    Fetch info["archive"] in one request and extract it while it streams.
+    Returns the extracted package folder.
+    """
+    archive = info["archive"]
+    folder = package_dir(info)
+    reg = registry.get_registry(info["registry"])
+    expected = info.get("sha256")
+    hashes = {} if hashes is None else hashes
+    keep = package_file_filter(info)
+
+    os.makedirs(save_root, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=save_root, prefix=".extract-")
+    print(f"[↓] {archive}")
+    try:
+        if archive.endswith(".zip"):
+            # zip merkezi dizini dosya sonunda: önce diske akıt, sonra aç
+            zip_path = os.path.join(staging, ".archive.zip")
+            reg.fetch_file(archive, zip_path, expected)
+            _extract_zip(zip_path, staging, folder, hashes, keep)
+            os.remove(zip_path)
+            digest = expected
+        else:
+            with reg.open_stream(archive) as raw:
+                reader = _HashingReader(raw)
+                if archive.endswith((".tar.zst", ".tzst")):
+                    if zstandard is None:
+                        raise UnsupportedArchive("[ERROR] .tar.zst archives need the 'zstandard' package.")
+                    with zstandard.ZstdDecompressor().stream_reader(reader) as zst:
+                        _extract_tar_stream(zst, "r|", staging, folder, hashes, keep)
+                else:
+                    mode = next((m for ext, m in ARCHIVE_TAR_MODES.items() if archive.endswith(ext)), None)
+                    if mode is None:
+                        raise UnsupportedArchive(f"[ERROR] Unsupported archive format: {archive}")
+                    _extract_tar_stream(reader, mode, staging, folder, hashes, keep)
+                reader.drain()
+                digest = reader.hash.hexdigest()
+            print(f"[↓] {archive}: {format_size(reader.size)}")
+
+        if expected and digest != expected:
+            raise ChecksumMismatch(f"[ERROR] Checksum mismatch for {archive}: expected {expected}, got {digest}")
+
+        target = os.path.join(save_root, folder)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return target
 
 # ----------------------------------------
 # Paketi klasör olarak indir
 # ----------------------------------------
 
-def download_package_folder(package_name, version, user="CBatu", repo="pkgman", branch="main"):
-    folder = get_package_info(package_name, version, user, repo, branch)
-    
-    print(f"[INFO] Listing files in: {folder}")
-    files = list_folder_files_from_github(user, repo, branch, folder)
+def download_package_folder(package_name, version, user=None, repo=None, branch="main", jobs=None,
+                            save_root=".cache", hashes=None, platform_key=None):
+    """
+    hashes: optional dict filled with {path relative to the package folder: sha256}.
+    """
+    info = resolve_package(package_name, version, user, repo, branch, platform_key)
+    folder = info.get("folder")
+    reg = registry.get_registry(info["registry"])
+
+    if info.get("archive"):
+        try:
+            path = download_package_archive(info, save_root, hashes)
+            print(f"[SUCCESS] Extracted {info['archive']} to {path}")
+            return path
+        except ARCHIVE_FALLBACK_ERRORS as e:
+            # Yalnızca gerçek bir klasör girdisi varsa dosya dosya indirilebilir
+            if not folder:
+                raise
+            print(f"[WARN] Archive download failed ({e}); falling back to per-file download")
+            if hashes is not None:
+                hashes.clear()
+    elif not folder:
+        raise PackageNotFound(f"[ERROR] '{package_name} {info['version']}' has neither a folder nor an archive.")
     
-    for file_path in files:
-        download_file_from_repo(user, repo, branch, file_path)
+    # Aynalar (mirror) dosya listesini ve hashleri indekse yazar; listeleme gerekmez
+    expected = {}
+    if info.get("files"):
+        listed = info["files"]
+        expected = listed if isinstance(listed, dict) else {}
+        files = [f"{folder}/{rel}" for rel in listed]
+    else:
+        print(f"[INFO] Listing files in: {folder}")
+        files = reg.list_files(folder)
+
+    # Yalnızca bu platform/mimari için gereken dosyalar
+    keep = package_file_filter(info)
+    skipped = len(files)
+    files = [f for f in files if keep(os.path.relpath(f, folder).replace(os.sep, "/"))]
+    skipped -= len(files)
+    if skipped:
+        print(f"[INFO] Skipping {skipped} files not needed on {info['platform']}")
+
+    jobs = max(int(jobs or settings.get("jobs")), 1)
+    session = get_session()
+    progress = _Progress(len(files), package_name)
+    file_hashes = {}
+
+    # Sınırlı iş havuzu: tek oturum üzerinden eşzamanlı indirme
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        futures = {
+            pool.submit(reg.fetch_file, file_path, os.path.join(save_root, file_path),
+                        expected.get(os.path.relpath(file_path, folder).replace(os.sep, "/")), session): file_path
+            for file_path in files
+        }
+        for future in as_completed(futures):
+            file_path = futures[future]
+            file_hashes[file_path] = future.result()
+            progress.advance(os.path.getsize(os.path.join(save_root, file_path)))
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if progress.tty:
+            print()
+        raise
+    pool.shutdown(wait=True)
+    progress.finish()
+
+    if hashes is not None:
+        for file_path, digest in file_hashes.items():
+            hashes[os.path.relpath(file_path, folder).replace(os.sep, "/")] = digest
     
-    print(f"[SUCCESS] Downloaded all files to .cache/{folder}")
-    return os.path.join(".cache", folder)
+    print(f"[SUCCESS] Downloaded all files to {save_root}/{folder}")
+    return os.path.join(save_root, folder)
 
 # ----------------------------------------
 # install.sh çalıştır
@@ -113,6 +754,6 @@ def run_install_script_from_cache(folder_path):
         raise Exception("[ERROR] install.sh not found.")
     
     print(f"[RUN] Running install script: {install_path}")
-    subprocess.run(["chmod", "+x", install_path])
-    subprocess.run([install_path])
+    subprocess.run(["chmod", "+x", install_path], check=True)
+    subprocess.run([install_path], check=True)
     print(f"[DONE] install.sh executed successfully.")
\ No newline at end of file
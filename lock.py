@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+
+# ----------------------------------------
+# pkgman.lock: kurulan paketlerin çözülmüş sürümü, platformu ve hashleri
+#
+# {
+#   "version": 1,
+#   "packages": {
+#     "glfw": {
+#       "version": "3.4", "platform": "macos", "folder": "glfw-3.4.bin.MACOS",
+#       "archive": null, "archive_sha256": null,
+#       "dependencies": {"<paket>": "<sürüm>"},
+#       "files": {"include/GLFW/glfw3.h": "<sha256>", ...},          # paket içeriği
+#       "installed": {"vendor/include/GLFW/glfw3.h":                  # install.sh çıktısı
+#                     {"sha256": "...", "size": 1234, "mtime_ns": 0}}
+#     }
+#   }
+# }
+# ----------------------------------------
+
+LOCK_FILE = "pkgman.lock"
+LOCK_VERSION = 1
+
+
+def load_lock(path=LOCK_FILE):
+    if not os.path.exists(path):
+        return {"version": LOCK_VERSION, "packages": {}}
+    with open(path, "r") as f:
+        lock = json.load(f)
+    if lock.get("version") != LOCK_VERSION:
+        return {"version": LOCK_VERSION, "packages": {}}
+    return lock
+
+
+def save_lock(lock, path=LOCK_FILE):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(lock, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# ----------------------------------------
+# vendor/ anlık görüntüsü (yalnızca stat)
+# ----------------------------------------
+
+def snapshot(root="vendor"):
+    result = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            result[path.replace(os.sep, "/")] = (st.st_size, st.st_mtime_ns)
+    return result
+
+
+def installed_files(before, after):
+    """
+    Files install.sh created or rewrote, with hashes for the lock.
+    """
+    result = {}
+    for path, (size, mtime_ns) in after.items():
+        if before.get(path) == (size, mtime_ns):
+            continue
+        result[path] = {"sha256": hash_file(path), "size": size, "mtime_ns": mtime_ns}
+    return result
+
+# ----------------------------------------
+# Kilit girdileri
+# ----------------------------------------
+
+def locked_entry(lock, name, version=None):
+    entry = lock["packages"].get(name)
+    if entry is None:
+        return None
+    if version not in (None, "latest") and entry["version"] != version:
+        return None
+    return entry
+
+
+def record_package(lock, info, manifest, installed, requested=None):
+    files = {rel: e["sha256"] for rel, e in manifest["files"].items()}
+    lock["packages"][info["name"]] = {
+        "version": info["version"],
+        "requested": requested or info["version"],
+        "platform": info["platform"],
+        "folder": info.get("folder"),
+        "archive": info.get("archive"),
+        "archive_sha256": info.get("sha256"),
+        "dependencies": info.get("dependencies", {}),
+        "files": files,
+        "installed": installed,
+    }
+
+# ----------------------------------------
+# Hızlı doğrulama: önce stat, yalnızca stat değiştiyse hash
+# ----------------------------------------
+
+def verify_installed(entry):
+    """
+    True if every file the package installed is still present and intact.
+    Refreshes stored mtimes for files whose content is unchanged; returns
+    (ok, refreshed) so callers know whether to rewrite the lock. An entry
+    with no recorded files cannot be checked and is never ok.
+    """
+    refreshed = False
+    installed = entry.get("installed")
+    if not installed:
+        return False, refreshed
+    for path, meta in installed.items():
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False, refreshed
+        if st.st_size != meta["size"]:
+            return False, refreshed
+        if st.st_mtime_ns == meta["mtime_ns"]:
+            continue
+        if hash_file(path) != meta["sha256"]:
+            return False, refreshed
+        meta["mtime_ns"] = st.st_mtime_ns
+        refreshed = True
+    return True, refreshed
@@ -1,61 +1,40 @@
+import sys
+import daemon
 from arg import Arg
-from install import download_package_folder, run_install_script_from_cache
-from init import run_init_command
-from okgman_parser import build, clean  # builder/parser modülünden build & clean fonksiyonları
-import subprocess
-import os
 
+# Komutlar "modül:fonksiyon" olarak kaydedilir; modül (okgman_parser,
+# install -> requests, ...) yalnızca komut çalıştırılırken içe aktarılır,
+# --help ve basit komutlar hızlı açılır. Ölçüm: pkgman bench --startup
 
-def install_cmd(args):
-    name = args.get("name")
-    version = args.get("version", "latest")
-    force = args.get("force", False)
-    pos = args.get("_positional", [])
+BUILD_ARGS = {
+    "jobs": {"type": int, "required": False, "alias": ["-j"], "desc": "Build with the native engine using N parallel jobs (default: CPU count)"},
+    "keep-going": {"type": bool, "required": False, "alias": ["-k"], "desc": "Keep building independent steps after a failure"},
+    "native": {"type": bool, "required": False, "desc": "Build with the native engine instead of make"},
+    "profile": {"type": bool, "required": False, "desc": "Build with the native engine, record step timings to build/pkgman.trace.json and print a summary"},
+    "config": {"type": str, "required": False, "desc": "Comma-separated named configurations (e.g. debug,release,asan) to build together, each under build/configs/<name>"},
+}
 
-    if not name and pos:
-        name = pos[0]
-
-    if not name:
-        print("[!] Package name is required.")
-        return
-
-    print(f"Installing package '{name}' version '{version}'")
-    if force:
-        print("Force install enabled.")
-    # burada indirme, kurulum fonksiyonları çağırılabilir
-
-
-def build_cmd(args):
-    build()
-
-
-
-def clean_cmd(args):
-    clean()
-
-def rebuild(args):
-    clean()
-    build()
-
-if __name__ == "__main__":
+def make_cli():
     cli = Arg("pkgman", "Simple Python package manager")
 
     cli.add_command(
         "install",
         "Install a package",
-        install_cmd,
+        "okgman_parser:run_install_command",
         aliases=["i", "--install"],
         args_spec={
             "name": {"type": str, "required": True, "desc": "Package name"},
             "version": {"type": str, "required": False, "default": "latest", "desc": "Package version"},
             "force": {"type": bool, "required": False, "alias": ["-f"], "desc": "Force install"},
+            "jobs": {"type": int, "required": False, "alias": ["-j"], "desc": "Parallel downloads (default: 8)"},
+            "offline": {"type": bool, "required": False, "desc": "Resolve from the cached index and package store only"},
         }
     )
 
     cli.add_command(
         "init",
         "Initialize a new C project",
-        run_init_command,
+        "init:run_init_command",
         aliases=["--init"],
         args_spec={
             "name": {"type": str, "required": False, "desc": "Project name"},
@@ -65,23 +44,89 @@ if __name__ == "__main__":
     cli.add_command(
         "build",
         "Build the project",
-        build_cmd,
-        aliases=["b"]
+        "okgman_parser:run_build_command",
+        aliases=["b"],
+        args_spec=BUILD_ARGS
     )
 
 
+    cli.add_command(
+        "watch",
+        "Build, then rebuild affected targets whenever sources, headers or pkgman.py change",
+        "watch:run_watch_command",
+        aliases=["w"],
+        args_spec={
+            "jobs": BUILD_ARGS["jobs"],
+            "keep-going": BUILD_ARGS["keep-going"],
+            "debounce": {"type": int, "required": False, "default": 100, "desc": "Milliseconds to wait for a burst of saves to settle"},
+            "poll": {"type": bool, "required": False, "desc": "Poll file stats instead of using inotify"},
+        }
+    )
+
     cli.add_command(
         "clean",
         "Clean build directory",
-        clean_cmd,
+        "okgman_parser:run_clean_command",
         aliases=["c"]
     )
 
     cli.add_command(
         "rebuild",
         "Rebuild the project",
-        rebuild,
-        aliases=["rb"]
+        "okgman_parser:run_rebuild_command",
+        aliases=["rb"],
+        args_spec=BUILD_ARGS
     )
 
-    cli.parse()
+    cli.add_command(
+        "mirror",
+        "Sync packages into a local mirror directory (mirror <dest> <package[@version]>...)",
+        "registry:run_mirror_command",
+        args_spec={
+            "platform": {"type": str, "required": False, "desc": "Comma-separated platforms to mirror (default: host)"},
+            "registry": {"type": str, "required": False, "desc": "Registry URL to mirror from (default: registries setting)"},
+        }
+    )
+
+    cli.add_command(
+        "cache",
+        "Inspect or prune the package cache (cache stats | cache prune)",
+        "pkgcache:run_cache_command",
+        args_spec={
+            "max-size": {"type": str, "required": False, "desc": "Size limit for prune, e.g. 500M (default: cache_max_size / objcache_max_size settings)"},
+        }
+    )
+
+    cli.add_command(
+        "bench",
+        "Benchmark pkgman's build overhead on synthetic projects",
+        "bench:run_bench_command",
+        args_spec={
+            "sizes": {"type": str, "required": False, "desc": "Comma-separated source counts (default: 10,100,1000; up to 50000)"},
+            "jobs": {"type": int, "required": False, "alias": ["-j"], "desc": "Parallel build jobs (default: CPU count)"},
+            "per-lib": {"type": int, "required": False, "default": 50, "desc": "Sources per generated library"},
+            "fanout": {"type": int, "required": False, "default": 4, "desc": "Shared headers included by each source"},
+            "out": {"type": str, "required": False, "default": "bench.json", "desc": "Results file"},
+            "compare": {"type": str, "required": False, "desc": "Compare a previous results file against --out"},
+            "startup": {"type": bool, "required": False, "desc": "Check the import time of trivial commands (-X importtime) against --budget"},
+            "budget": {"type": int, "required": False, "default": 25, "desc": "Import budget in milliseconds for --startup"},
+        }
+    )
+
+    cli.add_command(
+        "daemon",
+        "Manage this project's build daemon (daemon start | stop | status)",
+        "daemon:run_daemon_command",
+        args_spec={
+            "idle-timeout": {"type": int, "required": False, "desc": "Seconds without requests before 'daemon run' exits (default: daemon_idle_timeout setting)"},
+        }
+    )
+
+    return cli
+
+if __name__ == "__main__":
+    # Daemon açıksa build/rebuild/clean ona iletilir
+    code = daemon.forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+    make_cli().parse()
@@ -1,6 +1,11 @@
 import os
-import glob
+import re
+import copy
 import sys
+import shlex
+import fnmatch
+import hashlib
+import srcindex
 from tools import *
 
 # --- Global Build Context ---
@@ -12,10 +17,20 @@ build_context = {
     "functions": {},        # fonksiyon isim -> shell komutu
     "custom_steps": [],     # farklı türde özel build adımları (tuple (type, dict))
     "variables": {},        # ek değişkenler
+    "dependencies": [],     # install() ile istenen paketler
+    "globs": {},            # files() desenleri -> sonuçlar (yeniden üretim önbelleği için)
+    "toolchain": {},        # generate_makefile'ın kullandığı CC/AR/LD
+    "toolchain_profile": {},  # tools.toolchain_profile(): sürüm, hedef, yetenekler
+    "pch": [],              # pch() ile önceden derlenecek başlıklar
+    "configurations": {},   # configuration() ile tanımlanan isimli yapılandırmalar
 }
+_EMPTY_CONTEXT = copy.deepcopy(build_context)
 
 def files(pattern):
-    return glob.glob(pattern)
+    # Kaynak ağacı dizininden: yalnızca mtime'ı değişen dizinler yeniden taranır
+    result = srcindex.glob(pattern)
+    build_context["globs"][pattern] = result
+    return result
 
 # --- API Fonksiyonları ---
 
@@ -37,20 +52,22 @@ def shell(cmd, name=None, deps=None):
             "deps": deps or [],
         }
 
-def exe(name, *sources, deps=[]):
+def exe(name, *sources, deps=[], unity=None):
     build_context["targets"].append({
         "type": "executable",
         "name": name,
         "sources": list(sources),
         "deps": deps,
+        "unity": unity,
     })
 
-def lib(name, *sources, deps=[]):
+def lib(name, *sources, deps=[], unity=None):
     build_context["targets"].append({
         "type": "library",
         "name": name,
         "sources": list(sources),
         "deps": deps,
+        "unity": unity,
     })
 
 def custom_step(step_type, **kwargs):
@@ -59,6 +76,316 @@ def custom_step(step_type, **kwargs):
 def variable(name, value):
     build_context["variables"][name] = value
 
+def install(name, version=None):
+    build_context["dependencies"].append({"name": name, "version": version})
+
+def pch(header, targets=None):
+    """
+    Precompile header for the named targets (all targets if None); their
+    sources are compiled with it force-included.
+    """
+    build_context["pch"].append({"header": header, "targets": targets})
+
+def configuration(name, **settings):
+    """
+    Named build configuration, built with `pkgman build --config name` under
+    build/configs/<name>. settings are config() keys; CFLAGS and LDFLAGS are
+    appended to the project's, everything else replaces it.
+    """
+    if not name or name.startswith(".") or any(c in name for c in "/\\, "):
+        raise Exception(f"[ERROR] Invalid configuration name: {name!r}")
+    build_context["configurations"][name] = settings
+
+# --- İsimli yapılandırmalar ---
+#
+# Her yapılandırma kendi çıktı kökünde (build/configs/<ad>) derlenir; birinden
+# ötekine geçmek diğerinin nesnelerini silmez. configuration() ile
+# tanımlanmamışsa debug, release ve asan hazır gelir.
+
+CONFIGURATIONS_DIR = "configs"
+CONFIGURATION_PRESETS = {
+    "debug": {"DEBUG": True},
+    "release": {"DEBUG": False},
+    "asan": {"DEBUG": True, "CFLAGS": "-fsanitize=address -fno-omit-frame-pointer", "LDFLAGS": "-fsanitize=address"},
+}
+APPENDED_KEYS = ("CFLAGS", "LDFLAGS")
+
+def configuration_config(name):
+    """
+    The project's config with the named configuration's settings applied.
+    """
+    known = dict(CONFIGURATION_PRESETS, **build_context["configurations"])
+    if name not in known:
+        raise Exception(f"[ERROR] Unknown configuration '{name}' (known: {', '.join(sorted(known))})")
+    config = dict(build_context["config"])
+    for key, value in known[name].items():
+        if key in APPENDED_KEYS:
+            value = as_list(config.get(key)) + as_list(value)
+        config[key] = value
+    return config
+
+def configuration_root(name, root="build"):
+    return f"{root}/{CONFIGURATIONS_DIR}/{name}"
+
+# --- Hedef planlama (Makefile üreticisi ve yerel motor ortak kullanır) ---
+
+def as_list(value):
+    if isinstance(value, str):
+        return shlex.split(value)
+    return list(value or [])
+
+def resolve_toolchain(config=None):
+    config = build_context["config"] if config is None else config
+    profile = toolchain_profile(config.get("CC"), config.get("AR"), config.get("LD"))
+    build_context["toolchain"] = {"CC": profile["CC"], "AR": profile["AR"], "LD": profile["LD"]}
+    build_context["toolchain_profile"] = profile
+    return build_context["toolchain"]
+
+# --- Hızlı bağlama (FAST_LINK) ---
+#
+# config("FAST_LINK", True) veya ayrıntılı:
+#   config("FAST_LINK", {"linker": "mold", "debug": {"split_dwarf": True},
+#                        "release": {"thin_archives": False}})
+# Seçenekler: thin_archives (iç kütüphaneler için ar T), linker ("auto",
+# "mold", "lld", "gold" ya da None: sistem bağlayıcısı), split_dwarf
+# (yalnızca DEBUG'da; hata ayıklama bilgisi .dwo'larda kalır, bağlayıcı
+# taşımaz). Araç zinciri desteklemeyen seçenekler sessizce kapanır.
+
+FAST_LINK_DEFAULTS = {"thin_archives": True, "linker": "auto", "split_dwarf": True}
+
+def fast_link_settings(config=None):
+    """
+    Effective fast-link options for the current DEBUG setting, limited to
+    what the toolchain profile supports; None when FAST_LINK is off.
+    """
+    config = build_context["config"] if config is None else config
+    value = config.get("FAST_LINK")
+    if not value:
+        return None
+    value = {} if value is True else dict(value)
+    mode = "debug" if config.get("DEBUG", False) else "release"
+    per_mode = value.pop(mode, None)
+    value.pop("release" if mode == "debug" else "debug", None)
+    if per_mode is False:
+        return None
+    options = dict(FAST_LINK_DEFAULTS, **value, **(per_mode or {}))
+
+    features = build_context["toolchain_profile"].get("features") or {}
+    linkers = features.get("linkers", [])
+    if options["linker"] == "auto":
+        options["linker"] = linkers[0] if linkers else None
+    elif options["linker"] not in linkers:
+        options["linker"] = None
+    options["thin_archives"] = bool(options["thin_archives"] and features.get("thin_archives"))
+    options["split_dwarf"] = bool(options["split_dwarf"] and mode == "debug" and features.get("split_dwarf"))
+    return options
+
+def archive_flags(config=None):
+    options = fast_link_settings(config)
+    return "rcsT" if options and options["thin_archives"] else "rcs"
+
+def link_flags(config=None):
+    """
+    LDFLAGS plus the linker selection: FAST_LINK's choice if set, otherwise
+    the fastest linker the toolchain profile found.
+    """
+    config = build_context["config"] if config is None else config
+    profile = build_context["toolchain_profile"]
+    options = fast_link_settings(config)
+    if options is None:
+        selected = fast_link_flags(profile)
+    elif options["linker"] and profile["LD"] == profile["CC"]:
+        selected = [f"-fuse-ld={options['linker']}"]
+    else:
+        selected = []
+    return selected + as_list(config.get("LDFLAGS"))
+
+def compile_flags(config=None, includes=None):
+    config = build_context["config"] if config is None else config
+    includes = build_context["includes"] if includes is None else includes
+    debug_flags = ["-g", "-O0"] if config.get("DEBUG", False) else ["-O2"]
+    options = fast_link_settings(config)
+    if options and options["split_dwarf"]:
+        debug_flags.append("-gsplit-dwarf")
+    include_flags = [f"-I{inc}" for inc in includes]
+    return debug_flags + ["-MMD", "-MP"] + as_list(config.get("CFLAGS")) + include_flags
+
+def object_path(proj_name, target, src, root="build"):
+    base = os.path.splitext(os.path.basename(src))[0]
+    if target["type"] == "library":
+        return f"{root}/obj/{proj_name}/{target['name']}/{base}.o"
+    return f"{root}/obj/{proj_name}/{base}.o"
+
+# --- Unity (jumbo) derleme ---
+#
+# config("UNITY", {"batch": 16, "exclude": ["src/special_*.c"]}) tüm hedeflerde,
+# exe(..., unity={...}) / unity=False hedef bazında. Kaynaklar yol hash'ine göre
+# içerikle tanımlanan sınırlarla gruplanır: dosya eklemek/silmek yalnızca kendi
+# grubunu değiştirir. Grup dosyası kaynakları #include eder; tanılar özgün
+# dosya adlarıyla raporlanır (gruplar -iquote . ile derlenir).
+
+UNITY_DEFAULT_BATCH = 8
+UNITY_FLAGS = ["-iquote", "."]
+
+def unity_settings(target, config=None):
+    config = build_context["config"] if config is None else config
+    value = target.get("unity")
+    if value is None:
+        value = config.get("UNITY")
+    if not value:
+        return None
+    if value is True:
+        value = {}
+    return {"batch": max(int(value.get("batch", UNITY_DEFAULT_BATCH)), 1), "exclude": list(value.get("exclude", []))}
+
+def _path_hash(path):
+    return int(hashlib.md5(path.encode()).hexdigest()[:8], 16)
+
+def unity_batches(sources, batch):
+    groups, current = [], []
+    for src in sorted(sources):
+        current.append(src)
+        if _path_hash(src) % batch == 0 or len(current) >= 2 * batch:
+            groups.append(current)
+            current = []
+    if current:
+        groups.append(current)
+    return groups
+
+def _write_if_changed(path, content):
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            if f.read() == content:
+                return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+def compile_units(proj_name, target, root="build", config=None):
+    """
+    [(source, object, extra flags)] for a target, writing unity files when
+    unity mode is on. Unity files are only rewritten when their content changes.
+    """
+    settings_ = unity_settings(target, config)
+    if settings_ is None:
+        return [(src, object_path(proj_name, target, src, root), []) for src in target["sources"]]
+
+    excluded = [s for s in target["sources"] if any(fnmatch.fnmatch(s, p) for p in settings_["exclude"])]
+    grouped = [s for s in target["sources"] if s not in excluded]
+    unity_dir = f"{root}/unity/{proj_name}"
+    units, keep = [], set()
+    for group in unity_batches(grouped, settings_["batch"]):
+        if len(group) == 1:
+            excluded.append(group[0])
+            continue
+        # Grup adı ilk kaynağa bağlı: önceki grupların değişmesi adı kaydırmaz
+        unity_file = f"{unity_dir}/{target['name']}_unity_{_path_hash(group[0]):08x}.c"
+        lines = ["/* pkgman unity build: generated, do not edit */"]
+        lines += [f'#include "{src}"' for src in group]
+        _write_if_changed(unity_file, "\n".join(lines) + "\n")
+        keep.add(os.path.basename(unity_file))
+        units.append((unity_file, object_path(proj_name, target, unity_file, root), UNITY_FLAGS))
+
+    # Artık kullanılmayan grup dosyaları; tam ad kalıbı, "app" hedefi "app_unity"
+    # hedefinin dosyalarını silmesin
+    if os.path.isdir(unity_dir):
+        pattern = re.compile(rf"{re.escape(target['name'])}_unity_[0-9a-f]{{8}}\.c")
+        for name in os.listdir(unity_dir):
+            if pattern.fullmatch(name) and name not in keep:
+                os.remove(os.path.join(unity_dir, name))
+
+    units += [(src, object_path(proj_name, target, src, root), []) for src in target["sources"] if src in excluded]
+    return units
+
+# --- Önceden derlenmiş başlıklar ---
+#
+# build/pch/<proj>/<başlık> asıl başlığı #include eden küçük bir kopyadır; PCH
+# onun yanına yazılır (gcc: .gch, clang: .pch) ve nesneler "-include <kopya>"
+# ile derlenir. Derleyici PCH'yi kendisi bulur; -E ile önişleme (nesne
+# önbelleği) ise asıl başlığın içeriğini görür.
+
+PCH_EXTENSIONS = {"gcc": ".gch", "clang": ".pch"}
+PCH_FLAGS = ["-x", "c-header"]
+
+def target_pch(proj_name, target, root="build"):
+    """
+    None if the target does not use a PCH, otherwise
+    {"header", "stub", "output", "flags"}; output is None when the
+    toolchain cannot precompile headers (the header is still force-included).
+    """
+    names = {t["name"] for t in build_context["targets"]}
+    header = None
+    for entry in build_context["pch"]:
+        wanted = entry["targets"]
+        for name in wanted or []:
+            if name not in names:
+                raise Exception(f"[ERROR] pch({entry['header']!r}): unknown target '{name}'")
+        if wanted is None or target["name"] in wanted:
+            if header is not None and header != entry["header"]:
+                raise Exception(f"[ERROR] Target '{target['name']}' has more than one precompiled header.")
+            header = entry["header"]
+    if header is None:
+        return None
+
+    ext = PCH_EXTENSIONS.get((build_context["toolchain_profile"].get("features") or {}).get("pch"))
+    if ext is None:
+        return {"header": header, "stub": None, "output": None, "flags": ["-include", header]}
+
+    stub = os.path.normpath(f"{root}/pch/{proj_name}/{header}")
+    rel = os.path.relpath(header, os.path.dirname(stub))
+    _write_if_changed(stub, f'/* pkgman precompiled header stub: generated, do not edit */\n#include "{rel}"\n')
+    return {"header": header, "stub": stub, "output": stub + ext, "flags": ["-include", stub, "-Winvalid-pch"]}
+
+def link_inputs(target, objs, root="build"):
+    """
+    Objects, then the target's own archives by path (no -l search), then
+    the vendor library directory for LDFLAGS -l entries.
+    """
+    args = list(objs) + [library_file(lib, root) for lib in link_libraries(target)]
+    if os.path.exists("vendor/lib"):
+        args.append("-Lvendor/lib")
+    return args
+
+def library_file(target, root="build"):
+    return f"{root}/lib/lib{target['name']}.a"
+
+def executable_file(target, root="build"):
+    return f"{root}/{target['name']}"
+
+def target_dep_names(target):
+    return [d if isinstance(d, str) else d.__name__ for d in target.get("deps", [])]
+
+def step_dep_names(target):
+    """
+    deps that are build steps or files rather than libraries.
+    """
+    libs = {t["name"] for t in build_context["targets"] if t["type"] == "library"}
+    return [d for d in target_dep_names(target) if d not in libs]
+
+def link_libraries(target):
+    """
+    Library targets an executable links, dependents before dependencies.
+    Only the libraries named in deps (and theirs) when any are named;
+    otherwise every library in the project, as before.
+    """
+    libs = {t["name"]: t for t in build_context["targets"] if t["type"] == "library"}
+    wanted = [d for d in target_dep_names(target) if d in libs]
+    if not wanted:
+        return list(libs.values())
+
+    order, seen = [], set()
+    def visit(name):
+        if name in seen:
+            return
+        seen.add(name)
+        for dep in target_dep_names(libs[name]):
+            if dep in libs:
+                visit(dep)
+        order.append(libs[name])
+    for name in wanted:
+        visit(name)
+    return order[::-1]
+
 # --- Makefile üreticisi ---
 
 def generate_makefile(out_path="Makefile"):
@@ -71,23 +398,17 @@ def generate_makefile(out_path="Makefile"):
     custom_steps = build_context["custom_steps"]
     variables = build_context["variables"]
 
-    cc = config.get("CC", find_cc())
-    ar = config.get("AR", find_ar())
-    ld = config.get("LD", find_cc())
-
-    cflags = config.get("CFLAGS", [])
-    ldflags = config.get("LDFLAGS", [])
-    debug = config.get("DEBUG", False)
+    toolchain = resolve_toolchain(config)
+    cc, ar, ld = toolchain["CC"], toolchain["AR"], toolchain["LD"]
 
-    debug_flags = ["-g", "-O0"] if debug else ["-O2"]
-    include_flags = [f"-I{inc}" for inc in includes]
+    ldflags = link_flags(config)
 
     lines = []
     lines.append("SHELL := /bin/bash")
     lines.append(f"CC = {cc}")
     lines.append(f"AR = {ar}")
     lines.append(f"LD = {ld}")
-    lines.append(f"CFLAGS = {' '.join(debug_flags + ['-MMD', '-MP'] + cflags + include_flags)}")
+    lines.append(f"CFLAGS = {' '.join(compile_flags(config, includes))}")
     lines.append(f"LDFLAGS = {' '.join(ldflags)}")
 
     for var, val in variables.items():
@@ -100,7 +421,21 @@ def generate_makefile(out_path="Makefile"):
     lines.append("")
 
     all_bins = []
-    lib_targets = []
+    dep_files = []
+
+    # Önceden derlenmiş başlıklar (her başlık için tek kural)
+    pch_rules = {}
+    for target in targets:
+        info = target_pch(proj_name, target)
+        if info is None or info["output"] is None or info["output"] in pch_rules:
+            continue
+        pch_rules[info["output"]] = info
+        dep_files.append(os.path.splitext(info["output"])[0] + ".d")
+        lines.append(f"{info['output']}: {info['header']}")
+        lines.append(f"\t@mkdir -p {os.path.dirname(info['output'])}")
+        lines.append(f'\t@echo -e "\\033[1;36m[PCH]\\033[0m Precompiling {info["header"]}"')
+        lines.append(f"\t@$(CC) $(CFLAGS) {' '.join(PCH_FLAGS)} {info['stub']} -o {info['output']}")
+        lines.append("")
 
     # Fonksiyon hedefleri
     for fname, info in functions.items():
@@ -117,30 +452,34 @@ def generate_makefile(out_path="Makefile"):
         if target["type"] != "library":
             continue
 
-        libname = target["name"]
-        libfile = f"build/lib/lib{libname}.a"
-        lib_targets.append(libfile)
+        libfile = library_file(target)
         obj_files = []
 
-        for src in target["sources"]:
-            base = os.path.splitext(os.path.basename(src))[0]
-            obj_path = f"build/obj/{proj_name}/{libname}/{base}.o"
+        pch_info = target_pch(proj_name, target)
+        for src, obj_path, extra in compile_units(proj_name, target):
             obj_dir = os.path.dirname(obj_path)
             obj_files.append(obj_path)
+            dep_files.append(os.path.splitext(obj_path)[0] + ".d")
 
-            deps_makefile = [d if isinstance(d, str) else d.__name__ for d in target.get("deps", [])]
+            deps_makefile = step_dep_names(target)
+            if pch_info is not None:
+                extra = extra + pch_info["flags"]
+                if pch_info["output"]:
+                    deps_makefile = [pch_info["output"]] + deps_makefile
             dep_str = " ".join(deps_makefile)
+            extra_str = "".join(f" {flag}" for flag in extra)
 
             lines.append(f"{obj_path}: {src} {dep_str}")
             lines.append(f"\t@mkdir -p {obj_dir}")
             lines.append(f'\t@echo -e "\\033[1;36m[CC]\\033[0m Compiling {src}"')
-            lines.append(f"\t@$(CC) $(CFLAGS) -c {src} -o {obj_path}")
+            lines.append(f"\t@$(CC) $(CFLAGS){extra_str} -c {src} -o {obj_path}")
             lines.append("")
 
         lines.append(f"{libfile}: {' '.join(obj_files)}")
         lines.append(f"\t@mkdir -p build/lib")
         lines.append(f'\t@echo -e "\\033[1;35m[AR]\\033[0m Archiving {libfile}"')
-        lines.append(f"\t@$(AR) rcs {libfile} {' '.join(obj_files)}")
+        lines.append(f"\t@rm -f {libfile}")
+        lines.append(f"\t@$(AR) {archive_flags(config)} {libfile} {' '.join(obj_files)}")
         lines.append("")
 
     # Executable hedefleri
@@ -148,34 +487,36 @@ def generate_makefile(out_path="Makefile"):
         if target["type"] != "executable":
             continue
 
-        name = target["name"]
-        bin_path = f"build/{name}"
+        bin_path = executable_file(target)
         bin_dir = os.path.dirname(bin_path)
         obj_files = []
 
-        for src in target["sources"]:
-            base = os.path.splitext(os.path.basename(src))[0]
-            obj_path = f"build/obj/{proj_name}/{base}.o"
+        pch_info = target_pch(proj_name, target)
+        for src, obj_path, extra in compile_units(proj_name, target):
             obj_dir = os.path.dirname(obj_path)
             obj_files.append(obj_path)
+            dep_files.append(os.path.splitext(obj_path)[0] + ".d")
 
-            deps_makefile = [d if isinstance(d, str) else d.__name__ for d in target.get("deps", [])]
+            deps_makefile = step_dep_names(target)
+            if pch_info is not None:
+                extra = extra + pch_info["flags"]
+                if pch_info["output"]:
+                    deps_makefile = [pch_info["output"]] + deps_makefile
             dep_str = " ".join(deps_makefile)
+            extra_str = "".join(f" {flag}" for flag in extra)
 
             lines.append(f"{obj_path}: {src} {dep_str}")
             lines.append(f"\t@mkdir -p {obj_dir}")
             lines.append(f'\t@echo -e "\\033[1;36m[CC]\\033[0m Compiling {src}"')
-            lines.append(f"\t@$(CC) $(CFLAGS) -c {src} -o {obj_path}")
+            lines.append(f"\t@$(CC) $(CFLAGS){extra_str} -c {src} -o {obj_path}")
             lines.append("")
 
-        lib_links = " ".join([f"-l{lib['name']}" for lib in targets if lib["type"] == "library"])
-        vendor_lib = "-Lvendor/lib" if os.path.exists("vendor/lib") else ""
-        lib_links += "-Lbuild/lib" if os.path.exists("build/lib") else ""
+        link_args = link_inputs(target, obj_files)
 
-        lines.append(f"{bin_path}: {' '.join(obj_files)} {' '.join(lib_targets)}")
+        lines.append(f"{bin_path}: {' '.join(obj_files + [library_file(lib) for lib in link_libraries(target)])}")
         lines.append(f"\t@mkdir -p {bin_dir}")
         lines.append(f'\t@echo -e "\\033[1;33m[LD]\\033[0m Linking {bin_path}"')
-        lines.append(f"\t@$(LD) {vendor_lib} {lib_links} {' '.join(obj_files)} -o {bin_path} $(LDFLAGS)")
+        lines.append(f"\t@$(LD) {' '.join(link_args)} -o {bin_path} $(LDFLAGS)")
         lines.append("")
 
         all_bins.append(bin_path)
@@ -230,27 +571,56 @@ def generate_makefile(out_path="Makefile"):
             help_lines.append(f'\t@echo -e "\\033[1;35m  lib{target["name"]}.a\\033[0m - Static library target"')
 
     lines.append("\n".join(help_lines))
-    lines.append("-include build/obj/*.d")
+    # Derleyicinin -MMD çıktıları (iç içe nesne dizinleri dahil) ve yerel
+    # motorun bağımlılık veritabanından ürettiği kurallar
+    lines.append(f"-include {' '.join(dep_files)}")
+    lines.append("-include build/deps.mk")
+
+    content = "\n".join(lines)
+
+    # İçerik aynıysa dosyaya dokunma: make'in mtime görüşü bozulmasın
+    if os.path.exists(out_path):
+        with open(out_path, "r") as f:
+            if f.read() == content:
+                print(f"Makefile unchanged at {out_path}")
+                return
 
     with open(out_path, "w") as f:
-        f.write("\n".join(lines))
+        f.write(content)
 
     print(f"Makefile generated at {out_path}")
 
 # --- Kullanım girişi ---
 
-def build_mk(build_config_file):
+def reset_build_context():
+    """
+    Empty build_context in place before re-evaluating the config; other
+    modules hold references to the dict itself.
+    """
+    build_context.clear()
+    build_context.update(copy.deepcopy(_EMPTY_CONTEXT))
+
+def eval_config(build_config_file):
     if not os.path.exists(build_config_file):
         print(f"Hata: Yapılandırma dosyası bulunamadı: {build_config_file}", file=sys.stderr)
         exit(1)
 
+    # Aynı süreçte ikinci değerlendirme (watch, daemon) eski hedefleri taşımasın
+    reset_build_context()
     try:
         with open(build_config_file, "r") as f:
             config_code = f.read()
 
         exec(config_code)
-        generate_makefile()
 
     except Exception as e:
         print(f"Yapılandırma dosyasını işlerken hata oluştu: {e}", file=sys.stderr)
         sys.exit(1)
+
+def build_mk(build_config_file):
+    eval_config(build_config_file)
+    try:
+        generate_makefile()
+    except Exception as e:
+        print(f"Yapılandırma dosyasını işlerken hata oluştu: {e}", file=sys.stderr)
+        sys.exit(1)
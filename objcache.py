@@ -0,0 +1,233 @@
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+import settings
+from pkgcache import parse_size, clone_file
+
+# ----------------------------------------
+# Derleyici çıktısı önbelleği (ccache benzeri)
+#
+#   <cache_dir>/objcache/ab/abcdef....o   nesne dosyası
+#   <cache_dir>/objcache/ab/abcdef....d   depfile (nesne yolu yer tutucuyla)
+#   <cache_dir>/objcache/ab/abcdef....dwo ayrık DWARF (-gsplit-dwarf ile)
+#   <cache_dir>/objcache/tmp/             yazma alanı
+#
+# Anahtar: önişlenmiş çeviri birimi + normalleştirilmiş bayraklar + derleyici
+# kimliği (gerçek yol, boyut, mtime). Önişlenmiş çıktı #line işaretleriyle
+# kaynak yolunu da içerdiğinden farklı dosyalar çakışmaz.
+# ----------------------------------------
+
+CACHE_VERSION = "1"
+OBJ_PLACEHOLDER = "@PKGMAN_OBJ@"
+
+# Yalnızca çıktı yerini/depfile üretimini etkileyen bayraklar anahtara girmez
+_DROP_FLAGS = {"-MMD", "-MD", "-MP", "-c"}
+_DROP_WITH_VALUE = {"-o", "-MF", "-MT", "-MQ"}
+
+_compiler_ids = {}
+
+
+def cache_root():
+    return os.path.join(settings.cache_dir(), "objcache")
+
+
+def _entry_paths(key):
+    base = os.path.join(cache_root(), key[:2], key[2:])
+    return base + ".o", base + ".d"
+
+
+def dwo_path(obj):
+    return os.path.splitext(obj)[0] + ".dwo"
+
+
+def depfile_path(obj):
+    return os.path.splitext(obj)[0] + ".d"
+
+
+def reset():
+    """
+    Forget memoized compiler identities; long-lived processes (watch, daemon)
+    call this between builds so an upgraded compiler is noticed.
+    """
+    _compiler_ids.clear()
+
+
+def compiler_identity(cc):
+    if cc not in _compiler_ids:
+        path = os.path.realpath(shutil.which(cc) or cc)
+        st = os.stat(path)
+        _compiler_ids[cc] = f"{path}:{st.st_size}:{st.st_mtime_ns}"
+    return _compiler_ids[cc]
+
+
+def normalized_flags(cmd, src):
+    """
+    Flags of [cc, flags..., -c, src, -o obj] that can change the object.
+    """
+    flags = []
+    args = iter(cmd[1:])
+    for arg in args:
+        if arg in _DROP_WITH_VALUE:
+            next(args, None)
+        elif arg not in _DROP_FLAGS and arg != src:
+            flags.append(arg)
+    return flags
+
+
+def compute_key(cmd, src, extra_inputs=()):
+    """
+    Digest for a compile command, or None if the source does not preprocess
+    (the real compile then reports the error). The contents of extra_inputs
+    (e.g. a precompiled header) are part of the key.
+    """
+    cc = cmd[0]
+    flags = normalized_flags(cmd, src)
+    result = subprocess.run([cc] + flags + ["-E", src], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if result.returncode != 0:
+        return None
+    h = hashlib.sha256()
+    for part in (CACHE_VERSION, compiler_identity(cc), "\0".join(flags)):
+        h.update(part.encode())
+        h.update(b"\0")
+    h.update(result.stdout)
+    for path in extra_inputs:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+# ----------------------------------------
+# Geri yükleme: hardlink > reflink > kopya
+# ----------------------------------------
+
+def _place(src, dest):
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+        return
+    except OSError:
+        pass
+    clone_file(src, dest)
+
+
+def restore(key, obj):
+    cached_obj, cached_dep = _entry_paths(key)
+    if not (os.path.exists(cached_obj) and os.path.exists(cached_dep)):
+        return False
+    os.makedirs(os.path.dirname(obj) or ".", exist_ok=True)
+    try:
+        _place(cached_obj, obj)
+        if os.path.exists(dwo_path(cached_obj)):
+            _place(dwo_path(cached_obj), dwo_path(obj))
+        # Hardlink paylaşılan inode'un mtime'ını da günceller: LRU için son kullanım
+        os.utime(obj)
+        with open(cached_dep, "r") as f:
+            dep_text = f.read()
+    except OSError:
+        return False
+    with open(depfile_path(obj), "w") as f:
+        f.write(dep_text.replace(OBJ_PLACEHOLDER, obj))
+    return True
+
+
+def store(key, obj):
+    dep = depfile_path(obj)
+    if not (os.path.exists(obj) and os.path.exists(dep)):
+        return
+    cached_obj, cached_dep = _entry_paths(key)
+    tmp_dir = os.path.join(cache_root(), "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(cached_obj), exist_ok=True)
+
+    with open(dep, "r") as f:
+        dep_text = f.read().replace(obj, OBJ_PLACEHOLDER)
+    fd, tmp_dep = tempfile.mkstemp(dir=tmp_dir, suffix=".d")
+    with os.fdopen(fd, "w") as f:
+        f.write(dep_text)
+    fd, tmp_obj = tempfile.mkstemp(dir=tmp_dir, suffix=".o")
+    os.close(fd)
+    shutil.copyfile(obj, tmp_obj)
+    # Önce depfile ve .dwo: nesne görünür olduğunda girdi tamdır
+    os.replace(tmp_dep, cached_dep)
+    if os.path.exists(dwo_path(obj)):
+        fd, tmp_dwo = tempfile.mkstemp(dir=tmp_dir, suffix=".dwo")
+        os.close(fd)
+        shutil.copyfile(dwo_path(obj), tmp_dwo)
+        os.replace(tmp_dwo, dwo_path(cached_obj))
+    os.replace(tmp_obj, cached_obj)
+
+# ----------------------------------------
+# İstatistik ve LRU budama
+# ----------------------------------------
+
+def _entries():
+    root = cache_root()
+    result = []
+    for dirpath, _, filenames in os.walk(root):
+        if os.path.basename(dirpath) == "tmp":
+            continue
+        for name in filenames:
+            if not name.endswith(".o"):
+                continue
+            path = os.path.join(dirpath, name)
+            sidecars = [path[:-2] + ".d", path[:-2] + ".dwo"]
+            try:
+                st = os.stat(path)
+                size = st.st_size + sum(os.path.getsize(p) for p in sidecars if os.path.exists(p))
+            except OSError:
+                continue
+            result.append((st.st_mtime, path, size))
+    return result
+
+
+def stats():
+    entries = _entries()
+    return {
+        "root": cache_root(),
+        "entries": len(entries),
+        "size": sum(size for _, _, size in entries),
+        "max_size": parse_size(settings.get("objcache_max_size")),
+    }
+
+
+def prune(max_size=None):
+    """
+    Evict least-recently-used objects until the cache fits in max_size.
+    Returns bytes freed.
+    """
+    max_size = parse_size(settings.get("objcache_max_size") if max_size is None else max_size)
+    entries = sorted(_entries())
+    total = sum(size for _, _, size in entries)
+    freed = 0
+    while entries and total > max_size:
+        _, path, size = entries.pop(0)
+        for p in (path, path[:-2] + ".d", path[:-2] + ".dwo"):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+        total -= size
+        freed += size
+
+    # Yarım kalmış yazmalar
+    tmp_dir = os.path.join(cache_root(), "tmp")
+    now = time.time()
+    if os.path.isdir(tmp_dir):
+        for name in os.listdir(tmp_dir):
+            path = os.path.join(tmp_dir, name)
+            try:
+                if now - os.path.getmtime(path) > 600:
+                    os.remove(path)
+            except OSError:
+                pass
+    return freed
+
+
+def prune_if_needed():
+    info = stats()
+    if info["size"] > info["max_size"]:
+        prune(info["max_size"])
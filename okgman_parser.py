@@ -1,13 +1,19 @@
-import ast
 import os
 import re
 import json
 import subprocess
 import shutil
 import hashlib
-from install import download_package_folder, run_install_script_from_cache
+import threading
+import settings
+import srcindex
+import mkgen
+import objcache
+import buildtrace as trace
+from pkgcache import fetch_package, prune_if_needed
 from colorama import Fore, Style, init as colorama_init
-from mkgen import build_mk
+from mkgen import build_mk, build_context, eval_config, generate_makefile, resolve_toolchain
+from lock import load_lock, save_lock, locked_entry, record_package, verify_installed, snapshot, installed_files
 from tools import *
 
 colorama_init(autoreset=True)
@@ -69,28 +75,64 @@ def debug(enabled):
 # --- Hashing ---
 
 def get_md5(path):
+    h = hashlib.md5()
     with open(path, "rb") as f:
-        return hashlib.md5(f.read()).hexdigest()
+        for chunk in iter(lambda: f.read(srcindex.CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# --- Makefile yeniden üretim önbelleği ---
+
+REGEN_STATE_PATH = "build/pkgman.regen.json"
+REGEN_ENV_VARS = ("CC", "AR", "LD", "CFLAGS", "LDFLAGS", "PATH")
+
+def build_inputs(pkgman_path, patterns, tools, makefile="Makefile"):
+    """
+    Everything the generated Makefile depends on: the config file, the
+    generator itself, files() glob results, toolchain binaries, environment
+    and the paths generate_makefile probes. Digests and globs come from the
+    source-tree index, so unchanged files and directories are only stat'ed.
+    """
+    return {
+        "config": srcindex.digest(pkgman_path),
+        "generator": srcindex.digest(mkgen.__file__),
+        "globs": {pattern: srcindex.glob(pattern) for pattern in patterns},
+        "toolchain": {name: tool_identity(name) for name in tools},
+        "env": {key: os.environ.get(key) for key in REGEN_ENV_VARS},
+        "paths": {path: os.path.exists(path) for path in ("vendor/lib", "build/lib")},
+        "makefile": srcindex.digest(makefile),
+    }
+
+def load_regen_state(state_path=REGEN_STATE_PATH):
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, "r") as f:
+            return json.load(f)
+    except ValueError:
+        return None
 
-def has_pkgman_txt_changed(pkgman_path="pkgman.py", md5_path="build/pkgman.md5"):
+def has_build_inputs_changed(pkgman_path="pkgman.py", state_path=REGEN_STATE_PATH):
     if not os.path.exists(pkgman_path):
         raise FileNotFoundError(f"{Fore.RED}[PANIC]{Style.RESET_ALL} {pkgman_path} not found.")
-
-    current_md5 = get_md5(pkgman_path)
-
-    if not os.path.exists(md5_path):
+    state = load_regen_state(state_path)
+    if state is None:
         return True
-
-    with open(md5_path, "r") as f:
-        stored_md5 = f.read().strip()
-
-    return current_md5 != stored_md5
-
-def save_pkgman_md5(pkgman_path="pkgman.txt", md5_path="build/pkgman.md5"):
-    current_md5 = get_md5(pkgman_path)
-    os.makedirs(os.path.dirname(md5_path), exist_ok=True)
-    with open(md5_path, "w") as f:
-        f.write(current_md5)
+    return build_inputs(pkgman_path, state["globs"], state["tools"]) != state["inputs"]
+
+def save_build_inputs(pkgman_path="pkgman.py", state_path=REGEN_STATE_PATH):
+    patterns = sorted(build_context["globs"])
+    tools = sorted(set(build_context["toolchain"].values()))
+    state = {
+        "globs": patterns,
+        "tools": tools,
+        "dependencies": build_context["dependencies"],
+        "inputs": build_inputs(pkgman_path, patterns, tools),
+    }
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=2)
 
 
 # --- Compiler & Build ---
@@ -130,16 +172,88 @@ def link_objects(cc, objs, out_path, extra_flags=None):
     print(f"{Fore.MAGENTA}[LINK]{Style.RESET_ALL} {' '.join(cmd)}")
     subprocess.run(cmd, check=True)
 
-def install_dependencies(dependencies):
-    for dep in dependencies:
-        name = dep["name"]
-        version = dep.get("version")
-        print(f"{Fore.CYAN}[INSTALL]{Style.RESET_ALL} Installing {name} {version or ''}")
-        folder = download_package_folder(name, version)
-        run_install_script_from_cache(folder)
-        shutil.rmtree(folder)
+def install_dependencies(dependencies, force=False, lock_path="pkgman.lock"):
+    # Ağ katmanı (requests) yalnızca bağımlılık kurulurken yüklenir
+    from install import run_install_script_from_cache, host_platform, resolve_package
+    from resolver import resolve_graph, install_graph
+    lock = load_lock(lock_path)
+    platform_key = host_platform()
+    lock_mutex = threading.Lock()
+    install_mutex = threading.Lock()
+    verified = {}
+    state = {"changed": False, "installed": False}
+    # Getirilmiş ama henüz kurulmamış çalışma klasörleri (hata olursa silinir)
+    workdirs = {}
+
+    def locked(name, version=None):
+        entry = locked_entry(lock, name, version)
+        if force or entry is None or entry["platform"] != platform_key:
+            return None
+        return entry
+
+    def satisfied(name):
+        entry = locked(name)
+        if entry is None:
+            return False
+        if name not in verified:
+            ok, refreshed = verify_installed(entry)
+            state["changed"] |= refreshed
+            verified[name] = ok
+        return verified[name]
+
+    def lookup(name, version):
+        # Kilitteki paketlerin sürümü ve bağımlılıkları için indekse gitme
+        entry = locked(name, version)
+        if entry is not None:
+            return dict(entry, name=name)
+        return resolve_package(name, version)
+
+    def fetch(name):
+        if satisfied(name):
+            print(f"{Fore.BLUE}[SKIP]{Style.RESET_ALL} {name} {nodes[name]['version']} satisfied by {lock_path}")
+            return None
+        print(f"{Fore.CYAN}[INSTALL]{Style.RESET_ALL} Installing {name} {nodes[name]['version']}")
+        fetched = fetch_package(name, nodes[name]["version"], locked=locked(name))
+        with lock_mutex:
+            workdirs[name] = fetched[0]
+        return fetched
+
+    def install(name, fetched):
+        if fetched is None:
+            return
+        folder, info, manifest = fetched
+        # install.sh'ler vendor/ içine yazar; kurulan dosyaları ayırt etmek için sırayla çalışır
+        with install_mutex:
+            before = snapshot("vendor")
+            try:
+                run_install_script_from_cache(folder)
+            finally:
+                shutil.rmtree(folder)
+                with lock_mutex:
+                    workdirs.pop(name, None)
+            installed = installed_files(before, snapshot("vendor"))
+        if not installed:
+            print(f"{Fore.YELLOW}[WARN]{Style.RESET_ALL} install.sh for {name} wrote nothing under vendor/; "
+                  f"it cannot be verified and will run again next time")
+        with lock_mutex:
+            record_package(lock, info, manifest, installed, requested=requested.get(name))
+            state["changed"] = True
+            state["installed"] = True
         print(f"{Fore.GREEN}[DONE]{Style.RESET_ALL} Installed {name}")
 
+    requested = {dep["name"]: dep.get("version") for dep in dependencies}
+    nodes, edges, order = resolve_graph(dependencies, lookup)
+    try:
+        install_graph(order, edges, fetch, install, jobs=settings.get("install_jobs"))
+    finally:
+        # Bağımlılığı başarısız olduğu için kurulmayan paketler
+        for folder in workdirs.values():
+            shutil.rmtree(folder, ignore_errors=True)
+        if state["changed"]:
+            save_lock(lock, lock_path)
+    if state["installed"]:
+        prune_if_needed()
+
 
 def load_hashes(path="build/file_hashes.json"):
     if not os.path.exists(path):
@@ -307,7 +421,76 @@ def build():
 """
 
 def build():
-    build_mk("pkgman.py")
+    try:
+        _build_makefile()
+    finally:
+        srcindex.save()
+
+def _build_makefile(pkgman_path="pkgman.py"):
+    # Girdiler değişmediyse yapılandırmayı çalıştırma, Makefile'a dokunma
+    if not has_build_inputs_changed(pkgman_path):
+        dependencies = load_regen_state()["dependencies"]
+        if dependencies:
+            install_dependencies(dependencies)
+        if not has_build_inputs_changed(pkgman_path):
+            print(f"{Fore.BLUE}[SKIP]{Style.RESET_ALL} Makefile up to date.")
+            return
+
+    with trace.span(pkgman_path, "config-eval"):
+        eval_config(pkgman_path)
+    # Bağımlılıklar Makefile üretilmeden önce kurulmalı (vendor/lib kontrolü)
+    if build_context["dependencies"]:
+        with trace.span("dependencies", "install"):
+            install_dependencies(build_context["dependencies"])
+    with trace.span("Makefile", "generate"):
+        generate_makefile()
+    save_build_inputs(pkgman_path)
+
+# Bu süreçte son değerlendirilen yapılandırmanın girdileri (daemon isteklerinde sıcak kalır)
+_evaluated = {"inputs": None, "globs": [], "tools": []}
+
+def load_config(pkgman_path="pkgman.py"):
+    """
+    eval_config, skipped when this process already evaluated pkgman.py and
+    none of its build inputs have changed since (daemon requests).
+    """
+    state = _evaluated
+    if state["inputs"] is not None and build_inputs(pkgman_path, state["globs"], state["tools"]) == state["inputs"]:
+        return
+    state["inputs"] = None
+    eval_config(pkgman_path)
+    state["globs"] = sorted(build_context["globs"])
+    # Araç zinciri girdiye dahil: derleyici değişirse yeniden değerlendir
+    resolve_toolchain()
+    state["tools"] = sorted(set(build_context["toolchain"].values()))
+    state["inputs"] = build_inputs(pkgman_path, state["globs"], state["tools"])
+
+def build_native(jobs=None, keep_going=False, configurations=None):
+    """
+    Build with pkgman's own scheduler instead of make. With `configurations`
+    (names), each is built under build/configs/<name> in one shared graph.
+    """
+    # concurrent.futures (ve logging) yalnızca yerel motorla derlerken yüklenir
+    from engine import plan_actions, plan_configurations, run_actions
+    pkgman_path = "pkgman.py"
+    with trace.span(pkgman_path, "config-eval"):
+        load_config(pkgman_path)
+    if build_context["dependencies"]:
+        with trace.span("dependencies", "install"):
+            install_dependencies(build_context["dependencies"])
+    with trace.span("plan", "plan"):
+        if configurations:
+            actions = plan_configurations(configurations)
+            for name in configurations:
+                print(f"{Fore.CYAN}[CONFIG]{Style.RESET_ALL} {name} -> {mkgen.configuration_root(name)}")
+        else:
+            actions = plan_actions()
+    srcindex.save()
+    ok = run_actions(actions, jobs=jobs, keep_going=keep_going)
+    if settings.get("objcache"):
+        objcache.prune_if_needed()
+    if not ok:
+        raise Exception("[ERROR] Build failed.")
 
 def clean():
     build_dir = "build"
@@ -317,3 +500,54 @@ def clean():
         print(f"{Fore.GREEN}[DONE]{Style.RESET_ALL} Clean complete.")
     else:
         print(f"{Fore.BLUE}[SKIP]{Style.RESET_ALL} Nothing to clean.")
+
+# ----------------------------------------
+# Komut satırı girişleri (main.py "okgman_parser:<fonksiyon>" ile yükler)
+# ----------------------------------------
+
+def run_install_command(args):
+    name = args.get("name")
+    version = args.get("version", "latest")
+    force = args.get("force", False)
+    jobs = args.get("jobs")
+    offline = args.get("offline", False)
+    pos = args.get("_positional", [])
+
+    if not name and pos:
+        name = pos[0]
+
+    if not name:
+        print("[!] Package name is required.")
+        return
+
+    print(f"Installing package '{name}' version '{version}'")
+    if force:
+        print("Force install enabled.")
+    if jobs:
+        settings.override("jobs", jobs)
+    if offline:
+        settings.override("offline", True)
+    install_dependencies([{"name": name, "version": version}], force=force)
+
+def run_build_command(args):
+    jobs = args.get("jobs")
+    profile = args.get("profile", False)
+    configurations = [name.strip() for name in (args.get("config") or "").split(",") if name.strip()]
+    if profile:
+        trace.enable()
+    try:
+        # Adım adım süre yalnızca yerel motorda ölçülebilir; --profile onu seçer
+        if args.get("native") or jobs or configurations or profile:
+            build_native(jobs=jobs, keep_going=args.get("keep-going", False), configurations=configurations)
+        else:
+            build()
+    finally:
+        if profile:
+            print(f"[PROFILE] Trace written to {trace.write()}")
+
+def run_clean_command(args):
+    clean()
+
+def run_rebuild_command(args):
+    clean()
+    run_build_command(args)
@@ -0,0 +1,438 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import settings
+
+# ----------------------------------------
+# Kalıcı, içerik adresli paket deposu
+#
+#   <cache_dir>/store/objects/ab/abcdef...   dosya içerikleri (sha256)
+#   <cache_dir>/store/packages/<name>/<version>/<platform>.json   manifest
+#   <cache_dir>/store/tmp/                   indirme/yazma alanı
+#   <cache_dir>/store/tmp/dl-<anahtar özeti>/  paket indirmesi (.part dosyaları
+#                                            sonraki çalıştırmada sürdürülür)
+#
+# Tüm yazmalar tmp/ içinde yapılıp os.replace ile yerine taşınır; böylece
+# aynı depoyu paylaşan pkgman süreçleri yarım dosya görmez.
+# ----------------------------------------
+
+# Manifesti yazılmamış (henüz içe aktarılan) nesneleri silmemek için süre
+GC_GRACE_SECONDS = 600
+# Yarım kalan indirmeler bu süre boyunca sürdürülmek üzere saklanır
+PARTIAL_MAX_AGE = 24 * 3600
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().upper().rstrip("B")
+    unit = text[-1] if text and text[-1] in _SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    return int(float(number) * _SIZE_UNITS[unit])
+
+
+def format_size(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def store_root():
+    return os.path.join(settings.cache_dir(), "store")
+
+
+def _tmp_dir():
+    path = os.path.join(store_root(), "tmp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def blob_path(digest):
+    return os.path.join(store_root(), "objects", digest[:2], digest[2:])
+
+
+def package_key(name, version, platform_key):
+    return f"{name}/{version}/{platform_key}"
+
+
+def manifest_path(key):
+    return os.path.join(store_root(), "packages", *key.split("/")) + ".json"
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# FICLONE ioctl (linux/fs.h); reflink destekleyen dosya sistemlerinde (btrfs, xfs)
+_FICLONE = 0x40049409
+
+
+def _reflink(src, dest):
+    import fcntl
+    with open(src, "rb") as s, open(dest, "wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+
+
+def clone_file(src, dest):
+    """
+    Independent copy of src at dest: a reflink where the filesystem
+    supports it, otherwise a plain copy. Writing to dest never changes src.
+    """
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        _reflink(src, dest)
+        return
+    except (OSError, ImportError):
+        if os.path.exists(dest):
+            os.remove(dest)
+    shutil.copyfile(src, dest)
+
+
+def _try_lock(path):
+    """
+    Exclusive flock on path without waiting; None if another process holds
+    it. A lock file unlinked by its holder meanwhile is opened again.
+    """
+    import fcntl
+    while True:
+        lock = open(path, "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return None
+        try:
+            if os.fstat(lock.fileno()).st_ino == os.stat(path).st_ino:
+                return lock
+        except FileNotFoundError:
+            pass
+        lock.close()
+
+
+def _release(lock):
+    # Kilit tutulurken silinir; bekleyen açıcılar _try_lock'ta yeniden dener
+    try:
+        os.remove(lock.name)
+    except FileNotFoundError:
+        pass
+    lock.close()
+
+
+def _download_dir(key):
+    """
+    (path, lock) of the staging directory for key. The path is the same on
+    every run, so partial downloads left by an interrupted run are resumed.
+    If another process is downloading key, a private directory is used
+    and lock is None.
+    """
+    path = os.path.join(_tmp_dir(), "dl-" + hashlib.sha256(key.encode()).hexdigest()[:16])
+    try:
+        lock = _try_lock(path + ".lock")
+    except ImportError:
+        lock = None
+    if lock is None:
+        return tempfile.mkdtemp(dir=_tmp_dir(), prefix="dl-"), None
+    os.makedirs(path, exist_ok=True)
+    os.utime(path)
+    return path, lock
+
+
+def _write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=_tmp_dir(), suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+# ----------------------------------------
+# Nesne ekleme / manifest okuma-yazma
+# ----------------------------------------
+
+def add_blob(path, digest=None):
+    """
+    Move `path` into the object store (it is consumed). Returns its sha256.
+    """
+    digest = digest or hash_file(path)
+    target = blob_path(digest)
+    if os.path.exists(target):
+        os.utime(target)
+        os.remove(path)
+        return digest
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # Aynı dosya sisteminde değilse önce tmp/ içine kopyala, sonra atomik taşı
+    tmp_path = os.path.join(_tmp_dir(), f"{digest}.{os.getpid()}.blob")
+    shutil.move(path, tmp_path)
+    os.utime(tmp_path)
+    os.replace(tmp_path, target)
+    return digest
+
+
+def import_tree(key, src_dir, hashes=None):
+    """
+    Move every file under src_dir into the store and record a manifest for key.
+    hashes: optional {relative path: sha256} computed while downloading.
+    """
+    hashes = hashes or {}
+    files = {}
+    for dirpath, _, filenames in os.walk(src_dir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, src_dir).replace(os.sep, "/")
+            mode = os.stat(path).st_mode & 0o777
+            size = os.path.getsize(path)
+            digest = add_blob(path, hashes.get(rel))
+            files[rel] = {"sha256": digest, "size": size, "mode": mode}
+
+    manifest = {"key": key, "files": files, "created": time.time()}
+    _write_json_atomic(manifest_path(key), manifest)
+    return manifest
+
+
+def load_manifest(key):
+    path = manifest_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except ValueError:
+        return None
+    # Başka bir süreç nesneleri budamış olabilir
+    for entry in manifest["files"].values():
+        if not os.path.exists(blob_path(entry["sha256"])):
+            return None
+    os.utime(path)  # LRU için son kullanım zamanı
+    return manifest
+
+
+def materialize(manifest, dest):
+    """
+    Recreate the package tree at dest with reflinks (copy as fallback).
+    """
+    for rel, entry in manifest["files"].items():
+        target = os.path.join(dest, rel)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Hardlink değil: install.sh burada yerinde yazabilir (>>, truncate,
+        # derleme adımları), paylaşılan içerik adresli nesne bozulmamalı
+        clone_file(blob_path(entry["sha256"]), target)
+        os.chmod(target, entry["mode"])
+    return dest
+
+# ----------------------------------------
+# İstatistik ve LRU budama
+# ----------------------------------------
+
+def _manifests():
+    root = os.path.join(store_root(), "packages")
+    result = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                with open(path, "r") as f:
+                    manifest = json.load(f)
+                result.append((os.path.getmtime(path), path, manifest))
+            except (OSError, ValueError):
+                continue
+    return result
+
+
+def _blobs():
+    root = os.path.join(store_root(), "objects")
+    result = {}
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            result[os.path.basename(dirpath) + name] = (path, st.st_size, st.st_mtime)
+    return result
+
+
+def stats():
+    manifests = _manifests()
+    blobs = _blobs()
+    return {
+        "root": store_root(),
+        "packages": len(manifests),
+        "objects": len(blobs),
+        "size": sum(size for _, size, _ in blobs.values()),
+        "max_size": parse_size(settings.get("cache_max_size")),
+    }
+
+
+def prune(max_size=None):
+    """
+    Evict least-recently-used packages until the store fits in max_size,
+    then delete objects no manifest references. Returns bytes freed.
+    """
+    max_size = parse_size(settings.get("cache_max_size") if max_size is None else max_size)
+    manifests = sorted(_manifests(), key=lambda m: m[0])
+    blobs = _blobs()
+
+    def referenced():
+        return {e["sha256"] for _, _, m in manifests for e in m["files"].values()}
+
+    live = referenced()
+    total = sum(blobs[d][1] for d in live if d in blobs)
+    while manifests and total > max_size:
+        _, path, manifest = manifests.pop(0)
+        print(f"[CACHE] Evicting {manifest.get('key', path)}")
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        live = referenced()
+        total = sum(blobs[d][1] for d in live if d in blobs)
+
+    freed = 0
+    now = time.time()
+    tmp = _tmp_dir()
+    for name in os.listdir(tmp):
+        path = os.path.join(tmp, name)
+        if not name.startswith("dl-"):
+            continue
+        if name.endswith(".lock"):
+            # Klasörü kalmamış kilit dosyası
+            stale = not os.path.exists(path[:-len(".lock")])
+            path = path[:-len(".lock")]
+        else:
+            try:
+                stale = os.path.isdir(path) and now - os.path.getmtime(path) > PARTIAL_MAX_AGE
+            except FileNotFoundError:
+                stale = False
+        if not stale:
+            continue
+        try:
+            lock = _try_lock(path + ".lock")
+        except ImportError:
+            shutil.rmtree(path, ignore_errors=True)
+            continue
+        # Başka bir süreç bu indirmeyi sürdürüyor
+        if lock is None:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        _release(lock)
+    for digest, (path, size, mtime) in blobs.items():
+        if digest in live or now - mtime < GC_GRACE_SECONDS:
+            continue
+        try:
+            os.remove(path)
+            freed += size
+        except FileNotFoundError:
+            pass
+    return freed
+
+
+def prune_if_needed():
+    info = stats()
+    if info["size"] > info["max_size"]:
+        prune(info["max_size"])
+
+# ----------------------------------------
+# Paketi depodan getir (yoksa indirip depoya al)
+# ----------------------------------------
+
+def _locked_manifest(locked):
+    key = package_key(locked["name"], locked["version"], locked["platform"])
+    manifest = load_manifest(key)
+    if manifest is None:
+        return None
+    files = {rel: e["sha256"] for rel, e in manifest["files"].items()}
+    return manifest if files == locked["files"] else None
+
+
+def fetch_package(name, version, work_root=".cache", locked=None):
+    """
+    Returns (workdir, info, manifest). workdir is a fresh copy of the
+    package that the caller removes. With a matching lock entry whose
+    files are all in the store, no network request is made.
+    """
+    # install requests'i yükler; yalnızca paket getirilirken gerekir
+    from install import resolve_package, download_package_folder
+    manifest = None
+    if locked is not None:
+        info = dict(locked, name=name)
+        info["sha256"] = locked.get("archive_sha256")
+        manifest = _locked_manifest(info)
+
+    if manifest is None:
+        info = resolve_package(name, locked["version"] if locked else version)
+        key = package_key(info["name"], info["version"], info["platform"])
+        manifest = load_manifest(key)
+    else:
+        key = manifest["key"]
+
+    if manifest is None and settings.get("offline"):
+        raise Exception(f"[ERROR] '{key}' is not in the package cache (offline mode).")
+    if manifest is None:
+        staging, lock = _download_dir(key)
+        try:
+            hashes = {}
+            folder = download_package_folder(info["name"], info["version"], save_root=staging, hashes=hashes)
+            # Önceki bir denemeden kalıp artık istenmeyen yarım dosyalar pakete girmesin
+            for dirpath, _, filenames in os.walk(folder):
+                for name in filenames:
+                    if name.endswith(".part"):
+                        os.remove(os.path.join(dirpath, name))
+            manifest = import_tree(key, folder, hashes)
+            shutil.rmtree(staging, ignore_errors=True)
+        finally:
+            # Başarısızsa .part dosyaları ve kilit dosyası bir sonraki deneme için kalır
+            if lock is None:
+                shutil.rmtree(staging, ignore_errors=True)
+            elif manifest is not None:
+                _release(lock)
+            else:
+                lock.close()
+    else:
+        print(f"[CACHE] Using cached {key}")
+
+    os.makedirs(work_root, exist_ok=True)
+    workdir = tempfile.mkdtemp(dir=work_root, prefix=f"{info['name']}-{info['version']}-")
+    try:
+        return materialize(manifest, workdir), info, manifest
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+
+# ----------------------------------------
+# pkgman cache (nesne önbelleğini de kapsar)
+# ----------------------------------------
+
+def run_cache_command(args):
+    import objcache
+    pos = args.get("_positional", [])
+    action = pos[0] if pos else "stats"
+
+    if action == "stats":
+        info = stats()
+        print(f"Cache root : {info['root']}")
+        print(f"Packages   : {info['packages']}")
+        print(f"Objects    : {info['objects']}")
+        print(f"Size       : {format_size(info['size'])} / {format_size(info['max_size'])}")
+        info = objcache.stats()
+        print(f"Object cache root : {info['root']}")
+        print(f"Objects           : {info['entries']}")
+        print(f"Size              : {format_size(info['size'])} / {format_size(info['max_size'])}")
+    elif action == "prune":
+        freed = prune(args.get("max-size"))
+        freed += objcache.prune(args.get("max-size"))
+        print(f"[DONE] Freed {format_size(freed)}")
+    else:
+        print(f"[!] Unknown cache action: {action} (expected 'prune' or 'stats')")
@@ -0,0 +1,228 @@
+import os
+import abc
+import json
+import shutil
+import hashlib
+import contextlib
+import settings
+import install
+from resolver import resolve_graph
+
+# ----------------------------------------
+# Kayıt defteri (registry) arka uçları
+#
+#   github://<kullanıcı>/<depo>[@<dal>]   raw.githubusercontent + GitHub API
+#   http(s)://ayna/kök                    aynı package.json düzeniyle düz HTTP
+#   file:///yol/ayna  (veya düz yol)      yerel dizin, ağ yok
+#
+# Hepsi aynı arayüzü sunar: fetch_index(), list_files(folder),
+# fetch_file(path, local_path, expected_sha256, session), open_stream(path).
+# ----------------------------------------
+
+
+class _HttpRegistry(abc.ABC):
+    url = ""
+
+    @abc.abstractmethod
+    def file_url(self, path):
+        """
+        Absolute URL of a registry-relative path.
+        """
+
+    def _resolve(self, path):
+        return path if path.startswith(("http://", "https://")) else self.file_url(path)
+
+    def fetch_index(self):
+        return install.fetch_index_url(self.file_url("package.json"))
+
+    def fetch_file(self, path, local_path, expected_sha256=None, session=None):
+        return install.stream_download(self._resolve(path), local_path, expected_sha256, session=session)
+
+    @contextlib.contextmanager
+    def open_stream(self, path):
+        session = install.get_session()
+        with session.get(self._resolve(path), stream=True, timeout=settings.get("timeout")) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            yield response.raw
+
+
+class GitHubRegistry(_HttpRegistry):
+    def __init__(self, user, repo, branch="main"):
+        self.user = user
+        self.repo = repo
+        self.branch = branch
+        self.url = f"github://{user}/{repo}@{branch}"
+
+    def file_url(self, path):
+        return f"https://raw.githubusercontent.com/{self.user}/{self.repo}/{self.branch}/{path}"
+
+    def list_files(self, folder):
+        return install.list_package_files(self.user, self.repo, self.branch, folder)
+
+
+class HttpRegistry(_HttpRegistry):
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.url = self.base_url
+
+    def file_url(self, path):
+        return f"{self.base_url}/{path}"
+
+    def list_files(self, folder):
+        raise Exception(f"[ERROR] {self.url} cannot list '{folder}'; mirror entries must carry a 'files' map "
+                        f"(create the mirror with 'pkgman mirror').")
+
+
+class FileRegistry:
+    def __init__(self, root):
+        self.root = root
+        self.url = f"file://{os.path.abspath(root)}"
+
+    def _path(self, path):
+        return os.path.join(self.root, *path.split("/"))
+
+    def fetch_index(self):
+        with open(self._path("package.json"), "r") as f:
+            return json.load(f)
+
+    def list_files(self, folder):
+        return install.walk_folder(self.root, folder)
+
+    def fetch_file(self, path, local_path, expected_sha256=None, session=None):
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        part_path = local_path + ".part"
+        h = hashlib.sha256()
+        with open(self._path(path), "rb") as src, open(part_path, "wb") as dst:
+            for chunk in iter(lambda: src.read(install.CHUNK_SIZE), b""):
+                dst.write(chunk)
+                h.update(chunk)
+        digest = h.hexdigest()
+        if expected_sha256 and digest != expected_sha256:
+            os.remove(part_path)
+            raise install.ChecksumMismatch(f"[ERROR] Checksum mismatch for {path}: expected {expected_sha256}, got {digest}")
+        shutil.copymode(self._path(path), part_path)
+        os.replace(part_path, local_path)
+        return digest
+
+    @contextlib.contextmanager
+    def open_stream(self, path):
+        with open(self._path(path), "rb") as f:
+            yield f
+
+# ----------------------------------------
+# URL -> arka uç
+# ----------------------------------------
+
+_registries = {}
+
+
+def get_registry(url):
+    if url in _registries:
+        return _registries[url]
+
+    if url.startswith("github://"):
+        spec = url[len("github://"):]
+        repo_part, _, branch = spec.partition("@")
+        user, _, repo = repo_part.partition("/")
+        reg = GitHubRegistry(user, repo, branch or "main")
+    elif url.startswith(("http://", "https://")):
+        reg = HttpRegistry(url)
+    elif url.startswith("file://"):
+        reg = FileRegistry(url[len("file://"):])
+    else:
+        reg = FileRegistry(url)
+
+    _registries[url] = reg
+    _registries[reg.url] = reg
+    return reg
+
+
+def configured_registries():
+    urls = settings.get("registries")
+    if isinstance(urls, str):
+        urls = [urls]
+    return [get_registry(url) for url in urls]
+
+# ----------------------------------------
+# Ayna (mirror) oluşturma
+# ----------------------------------------
+
+def _parse_spec(spec):
+    name, _, version = spec.partition("@")
+    return {"name": name, "version": version or None}
+
+
+def mirror_packages(specs, dest, platforms=None, source=None):
+    """
+    Copy the given packages (and their dependencies) into dest using the
+    package.json layout, so dest can be used as a file:// or HTTP registry.
+    Every mirrored entry records its file hashes, so no listing is needed.
+    """
+    os.makedirs(dest, exist_ok=True)
+    index_path = os.path.join(dest, "package.json")
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    else:
+        index = {"packages": {}}
+
+    if source:
+        settings.override("registries", [source])
+    platforms = platforms or [install.detect_platform()]
+    dependencies = [_parse_spec(spec) for spec in specs]
+
+    for platform_key in platforms:
+        lookup = lambda name, version: install.resolve_package(name, version, platform_key=platform_key)
+        nodes, _, order = resolve_graph(dependencies, lookup)
+
+        for name in order:
+            info = nodes[name]
+            print(f"[MIRROR] {name} {info['version']} ({platform_key})")
+            hashes = {}
+            install.download_package_folder(name, info["version"], save_root=dest, hashes=hashes,
+                                            platform_key=platform_key)
+            source_reg = get_registry(info["registry"])
+            raw_versions = source_reg.fetch_index()["packages"][name][info["version"]]
+            versions = index["packages"].setdefault(name, {}).setdefault(info["version"], {})
+            if raw_versions.get("dependencies"):
+                versions["dependencies"] = raw_versions["dependencies"]
+
+            # Platform girdisi ve "macos-arm64" gibi mimari girdileri aynen taşınır
+            keys = [k for k in raw_versions if k == platform_key or k.startswith(platform_key + "-")]
+            for key in keys or [platform_key]:
+                raw = raw_versions.get(key, info)
+                entry = {"folder": raw} if isinstance(raw, str) else dict(raw)
+                for field in ("name", "version", "platform", "registry"):
+                    entry.pop(field, None)
+                # Dosyalar ayna içinde package_dir(info) altına indirildi
+                folder = install.package_dir(info)
+                if entry.get("folder", folder) == folder:
+                    entry["folder"] = folder
+                    entry["files"] = dict(sorted(hashes.items()))
+                if entry.get("archive"):
+                    archive = entry["archive"]
+                    if archive.startswith(("http://", "https://")):
+                        entry["archive"] = f"archives/{os.path.basename(archive)}"
+                    source_reg.fetch_file(archive, os.path.join(dest, entry["archive"]), entry.get("sha256"))
+                versions[key] = entry
+
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, index_path)
+    print(f"[SUCCESS] Mirror updated at {dest}")
+    return index
+
+# ----------------------------------------
+# pkgman mirror
+# ----------------------------------------
+
+def run_mirror_command(args):
+    pos = args.get("_positional", [])
+    if len(pos) < 2:
+        print("[!] Usage: pkgman mirror <dest> <package[@version]>...")
+        return
+    platforms = args.get("platform")
+    platforms = [p.strip() for p in platforms.split(",")] if platforms else None
+    mirror_packages(pos[1:], pos[0], platforms=platforms, source=args.get("registry"))
@@ -0,0 +1,135 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ----------------------------------------
+# Bağımlılık grafiği: çözümleme, çakışma ve döngü tespiti
+# ----------------------------------------
+
+def _pinned(version):
+    return version not in (None, "latest")
+
+
+def resolve_graph(dependencies, lookup):
+    """
+    Walk the dependency tree breadth-first.
+
+    dependencies: [{"name": ..., "version": ...}] requested by the project
+    lookup(name, version) -> info dict with a "dependencies" {name: version} map
+
+    A "latest" request follows any pin made elsewhere in the graph, however
+    deep; only two different pins for one package are a conflict.
+
+    Returns (nodes, edges, order): nodes {name: info}, edges {name: set of
+    dependency names} and a topological order (dependencies first).
+    """
+    cache = {}
+
+    def cached_lookup(name, version):
+        if (name, version) not in cache:
+            cache[(name, version)] = lookup(name, version)
+        return cache[(name, version)]
+
+    # Önceki turda toplanan sabitlemeler; sürümler değişmeyene dek yeniden yürü
+    pins = {}
+    seen = set()
+    while True:
+        nodes, edges, found = _walk(dependencies, cached_lookup, pins)
+        if found == pins:
+            return nodes, edges, topological_order(edges)
+        key = frozenset(found.items())
+        if key in seen:
+            raise Exception("[ERROR] Dependency versions do not settle: "
+                            + ", ".join(f"{n}@{v}" for n, v in sorted(found.items())))
+        seen.add(key)
+        pins = found
+
+
+def _walk(dependencies, lookup, pins):
+    nodes = {}
+    edges = {}
+    found = {}
+    pinned_by = {}
+    queue = [(dep["name"], dep.get("version"), "<project>") for dep in dependencies]
+
+    while queue:
+        name, version, parent = queue.pop(0)
+        if _pinned(version):
+            if name in found and found[name] != version:
+                raise Exception(
+                    f"[ERROR] Version conflict for '{name}': {pinned_by[name]} requires {found[name]}, "
+                    f"{parent} requires {version}."
+                )
+            found[name] = version
+            pinned_by.setdefault(name, parent)
+        if name in nodes:
+            continue
+
+        if not _pinned(version):
+            version = pins.get(name, version)
+        info = lookup(name, version)
+        nodes[name] = info
+        deps = info.get("dependencies") or {}
+        edges[name] = set(deps)
+        queue.extend((dep_name, dep_version, name) for dep_name, dep_version in sorted(deps.items()))
+
+    return nodes, edges, found
+
+
+def topological_order(edges):
+    order = []
+    state = {}  # 1: ziyaret ediliyor, 2: tamam
+
+    def visit(name, path):
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            cycle = path[path.index(name):] + [name]
+            raise Exception(f"[ERROR] Dependency cycle: {' -> '.join(cycle)}")
+        state[name] = 1
+        for dep in sorted(edges.get(name, ())):
+            visit(dep, path + [name])
+        state[name] = 2
+        order.append(name)
+
+    for name in sorted(edges):
+        visit(name, [])
+    return order
+
+# ----------------------------------------
+# Paralel kurulum: bağımsız dallar eşzamanlı, kurulum adımı bağımlılıklardan sonra
+# ----------------------------------------
+
+def install_graph(order, edges, fetch, install, jobs=4):
+    """
+    fetch(name) runs as soon as a worker is free (downloads do not depend on
+    other packages); install(name, fetched) runs once every dependency of
+    name has been installed. Tasks are submitted in topological order to a
+    FIFO pool, so a task only ever waits on tasks that already started.
+    """
+    done = {name: threading.Event() for name in order}
+    failed = set()
+    lock = threading.Lock()
+
+    def task(name):
+        try:
+            fetched = fetch(name)
+            for dep in edges.get(name, ()):
+                done[dep].wait()
+            with lock:
+                blocked = [dep for dep in edges.get(name, ()) if dep in failed]
+            if blocked:
+                raise Exception(f"[ERROR] Not installing '{name}': dependency '{blocked[0]}' failed.")
+            install(name, fetched)
+        except BaseException:
+            with lock:
+                failed.add(name)
+            raise
+        finally:
+            done[name].set()
+
+    with ThreadPoolExecutor(max_workers=max(int(jobs), 1)) as pool:
+        futures = [(name, pool.submit(task, name)) for name in order]
+
+    errors = [(name, f.exception()) for name, f in futures if f.exception() is not None]
+    if errors:
+        raise errors[0][1]
@@ -0,0 +1,86 @@
+import os
+import json
+
+# ----------------------------------------
+# Varsayılan ayarlar
+# ----------------------------------------
+
+DEFAULTS = {
+    "jobs": 8,           # eşzamanlı indirme sayısı
+    "install_jobs": 4,   # eşzamanlı kurulan bağımsız paket sayısı
+    "retries": 3,        # dosya başına yeniden deneme
+    "backoff": 0.5,      # ilk bekleme süresi (saniye), her denemede ikiye katlanır
+    "timeout": 30,       # HTTP istek zaman aşımı (saniye)
+    "registries": ["github://CBatu/pkgman@main"],  # sırayla denenir (file://, http(s)://, github://)
+    "listing_backend": "tree",  # tree | local
+    "local_root": ".",   # local listeleme arka ucu için depo kökü
+    "github_token": None,
+    "index_ttl": 300,    # package.json indeksi bu süre (saniye) yeniden doğrulanmaz
+    "offline": False,    # yalnızca önbellekteki indeks ve paketleri kullan
+    "cache_max_size": "2G",  # paket deposu üst sınırı (LRU ile budanır)
+    "objcache": True,    # yerel motorda derleyici çıktısı önbelleği
+    "objcache_max_size": "5G",  # nesne önbelleği üst sınırı (LRU ile budanır)
+    "daemon": False,     # build/rebuild/clean proje başına arka plan sunucusunda çalışır
+    "daemon_idle_timeout": 600,  # bu süre (saniye) istek gelmezse sunucu kapanır
+}
+
+_file_settings = None
+_overrides = {}
+
+
+def config_path():
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "pkgman", "config.json")
+
+
+def cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pkgman")
+
+
+def _load_file():
+    global _file_settings
+    if _file_settings is None:
+        path = config_path()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                _file_settings = json.load(f)
+        else:
+            _file_settings = {}
+    return _file_settings
+
+
+def _cast(value, default):
+    if isinstance(default, bool):
+        return value.lower() in ("true", "1", "yes")
+    if isinstance(default, list):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    if default is None:
+        return value
+    return type(default)(value)
+
+
+def get(key):
+    """
+    Resolve a setting: CLI override > PKGMAN_<KEY> env var > config.json > default.
+    """
+    if key in _overrides:
+        return _overrides[key]
+    default = DEFAULTS.get(key)
+    env = os.environ.get(f"PKGMAN_{key.upper()}")
+    if env is not None:
+        return _cast(env, default)
+    return _load_file().get(key, default)
+
+
+def override(key, value):
+    _overrides[key] = value
+
+
+def reset():
+    """
+    Forget overrides and re-read config.json on next use (daemon requests).
+    """
+    global _file_settings
+    _overrides.clear()
+    _file_settings = None
@@ -0,0 +1,247 @@
+import os
+import time
+import glob as _glob
+import marshal
+import fnmatch
+import hashlib
+
+# ----------------------------------------
+# Kaynak ağacı dizini (build/pkgman.srcindex)
+#
+#   dizinler: yol -> (mtime_ns, güvenilmez mi, [(ad, dizin mi), ...])
+#   dosyalar: yol -> (boyut, mtime_ns, inode, içerik özeti)
+#   globlar:  desen -> ([(dizin, mtime_ns), ...], "\0" ile birleşik sonuç)
+#
+# files() globları os.scandir listelerinden yanıtlanır; bir liste ancak
+# dizinin mtime'ı değiştiyse yeniden taranır (dosya eklemek, silmek ya da
+# yeniden adlandırmak dizinin mtime'ını değiştirir); okunan dizinlerin hiçbiri
+# değişmediyse glob sonucu da olduğu gibi döner. İçerik özeti istendiğinde
+# ve dosyanın stat bilgisi değiştiyse akışla hesaplanır.
+#
+# mtime çözünürlüğü kaba olabilir: son RACY_NS içinde değişmiş bir dizin ya
+# da dosyanın kaydı bir sonraki kullanımda yeniden doğrulanır (git'in "racy"
+# kuralı). Biçim marshal; ad listeleri diskte "\0" ile birleşik tek dizgi
+# olarak tutulur, 100k girdi birkaç milisaniyede yüklenir.
+# ----------------------------------------
+
+INDEX_PATH = "build/pkgman.srcindex"
+MAGIC = "PKSI"
+VERSION = 2
+RACY_NS = 2 * 10**9
+CHUNK_SIZE = 1024 * 1024
+
+_state = {"dirs": {}, "files": {}, "globs": {}, "dirty": False, "loaded": None, "visited": None}
+
+
+def _index(path=INDEX_PATH):
+    # Süreç boyunca bellekte kalır (watch, daemon); ilk kullanımda diskten okunur
+    if _state["loaded"] is None:
+        _state["loaded"] = path
+        try:
+            with open(path, "rb") as f:
+                magic, version, dirs, files, globs = marshal.load(f)
+            if magic == MAGIC and version == VERSION:
+                _state.update(dirs={key: _decode(record) for key, record in dirs.items()},
+                              files=files, globs=globs, dirty=False)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+    return _state
+
+
+def _split(joined):
+    return joined.split("\0") if joined else []
+
+
+def _encode(record):
+    mtime, racy, entries = record
+    return (mtime, racy, "\0".join(n for n, _ in entries), "\0".join(n for n, is_dir in entries if is_dir))
+
+
+def _decode(record):
+    mtime, racy, names, dirnames = record
+    dirnames = set(_split(dirnames))
+    return (mtime, racy, [(n, n in dirnames) for n in _split(names)])
+
+
+def save(path=INDEX_PATH):
+    state = _index(path)
+    if not state["dirty"]:
+        return
+    # Artık listede olmayan dosyaların kaydını at
+    dirs = state["dirs"]
+    listed = {}
+    files = {}
+    for p, record in state["files"].items():
+        parent = os.path.dirname(p) or os.curdir
+        if parent not in dirs:
+            files[p] = record
+            continue
+        if parent not in listed:
+            listed[parent] = {name for name, _ in dirs[parent][2]}
+        if os.path.basename(p) in listed[parent]:
+            files[p] = record
+    state["files"] = files
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        marshal.dump((MAGIC, VERSION, {key: _encode(record) for key, record in dirs.items()},
+                      files, state["globs"]), f)
+    os.replace(tmp_path, path)
+    state["dirty"] = False
+
+
+def _racy(mtime_ns):
+    return time.time_ns() - mtime_ns < RACY_NS
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def listdir(path):
+    """
+    [(name, is_dir)] for a directory, rescanned only when its mtime changed.
+    None if it is not a directory.
+    """
+    state = _index()
+    key = os.path.normpath(path)
+    mtime = _mtime(key)
+    known = state["dirs"].get(key)
+    if mtime is not None and known is not None and known[0] == mtime and not known[1]:
+        entries = known[2]
+    elif mtime is None:
+        if state["dirs"].pop(key, None) is not None:
+            state["dirty"] = True
+        entries = None
+    else:
+        try:
+            with os.scandir(key) as it:
+                entries = []
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    entries.append((entry.name, is_dir))
+        except NotADirectoryError:
+            entries = None
+        else:
+            state["dirs"][key] = (mtime, _racy(mtime), entries)
+            state["dirty"] = True
+    if state["visited"] is not None:
+        # glob() sonucu bu dizinlerin mtime'ı değişmedikçe geçerli
+        state["visited"].append((key, mtime, mtime is not None and _racy(mtime)))
+    return entries
+
+# ----------------------------------------
+# glob.glob yerine
+# ----------------------------------------
+
+def _match(pattern, dironly):
+    dirname, basename = os.path.split(pattern)
+    if not dirname:
+        dirs = [""]
+    elif _glob.has_magic(dirname):
+        dirs = _expand(dirname, dironly=True)
+    else:
+        dirs = [dirname]
+
+    result = []
+    for d in dirs:
+        entries = listdir(d or os.curdir)
+        if entries is None:
+            continue
+        if _glob.has_magic(basename):
+            # glob.glob gibi: desen '.' ile başlamıyorsa gizli adlar eşleşmez
+            hidden = basename.startswith(".")
+            names = [n for n, is_dir in entries
+                     if (is_dir or not dironly) and (hidden or not n.startswith("."))]
+            matched = fnmatch.filter(names, basename)
+        else:
+            matched = [n for n, is_dir in entries if n == basename and (is_dir or not dironly)]
+        prefix = os.path.join(d, "")
+        result += [prefix + n for n in matched]
+    return result
+
+
+def _expand(pattern, dironly=False):
+    if not _glob.has_magic(pattern):
+        if dironly:
+            return [pattern] if os.path.isdir(pattern) else []
+        return [pattern] if os.path.lexists(pattern) else []
+    return _match(pattern, dironly)
+
+
+def glob(pattern):
+    """
+    Sorted glob.glob(pattern), answered from the index. The result is kept
+    until one of the directories it read changes.
+    """
+    if pattern.endswith(os.sep) or (os.altsep and pattern.endswith(os.altsep)):
+        return sorted(_glob.glob(pattern))
+    if not _glob.has_magic(pattern):
+        return _expand(pattern)
+
+    state = _index()
+    known = state["globs"].get(pattern)
+    if known is not None and all(_mtime(d) == mtime for d, mtime in known[0]):
+        return _split(known[1])
+
+    state["visited"] = []
+    try:
+        result = sorted(_expand(pattern))
+        visited = state["visited"]
+    finally:
+        state["visited"] = None
+    if any(racy for _, _, racy in visited):
+        state["globs"].pop(pattern, None)
+    else:
+        state["globs"][pattern] = ([(d, mtime) for d, mtime, _ in visited], "\0".join(result))
+    state["dirty"] = True
+    return result
+
+# ----------------------------------------
+# İçerik özetleri
+# ----------------------------------------
+
+def hash_file(path):
+    """
+    blake2b digest of a file, read in CHUNK_SIZE pieces into one buffer.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.digest()
+
+
+def digest(path):
+    """
+    Hex content digest of path, re-hashed only when its size, mtime or inode
+    changed since it was last hashed. None if the file is missing.
+    """
+    state = _index()
+    key = os.path.normpath(path)
+    try:
+        st = os.stat(key)
+    except OSError:
+        if state["files"].pop(key, None) is not None:
+            state["dirty"] = True
+        return None
+    signature = (st.st_size, st.st_mtime_ns, st.st_ino)
+    known = state["files"].get(key)
+    if known is not None and known[:3] == signature and known[3] is not None:
+        return known[3]
+    value = hash_file(key).hex()
+    state["files"][key] = signature + (None if _racy(st.st_mtime_ns) else value,)
+    state["dirty"] = True
+    return value
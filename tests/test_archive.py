@@ -0,0 +1,83 @@
+import hashlib
+import io
+import json
+import os
+import tarfile
+
+import pytest
+
+import install
+import settings
+
+FILES = {"include/pkg.h": b"#define PKG 1\n", "install.sh": b"#!/bin/sh\n"}
+
+
+def _tar_gz(folder):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for rel, data in FILES.items():
+            member = tarfile.TarInfo(f"{folder}/{rel}")
+            member.size = len(data)
+            tar.addfile(member, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _registry(root, entry, archive=None):
+    """
+    A file:// registry with pkg 1.0 for "linux". The per-file folder is only
+    written when the entry names one.
+    """
+    if entry.get("folder"):
+        for rel, data in FILES.items():
+            path = os.path.join(root, entry["folder"], rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+    if archive is not None:
+        with open(os.path.join(root, entry["archive"]), "wb") as f:
+            f.write(archive)
+    with open(os.path.join(root, "package.json"), "w") as f:
+        json.dump({"packages": {"pkg": {"1.0": {"linux": entry}}}}, f)
+    settings.override("registries", [f"file://{root}"])
+
+
+def _download(tmp_path):
+    hashes = {}
+    path = install.download_package_folder("pkg", "1.0", save_root=str(tmp_path / "out"), hashes=hashes,
+                                           platform_key="linux")
+    return path, hashes
+
+
+def _assert_files(path, hashes):
+    for rel, data in FILES.items():
+        with open(os.path.join(path, rel), "rb") as f:
+            assert f.read() == data
+        assert hashes[rel] == hashlib.sha256(data).hexdigest()
+
+
+def test_archive_without_folder(tmp_path):
+    archive = _tar_gz("pkg-1.0")
+    _registry(str(tmp_path), {"archive": "pkg.tar.gz", "sha256": hashlib.sha256(archive).hexdigest()}, archive)
+    path, hashes = _download(tmp_path)
+    assert os.path.basename(path) == "pkg-1.0"
+    _assert_files(path, hashes)
+
+
+def test_corrupt_archive_falls_back_to_folder(tmp_path):
+    _registry(str(tmp_path), {"folder": "pkg", "archive": "pkg.tar.gz"}, b"not a gzip stream")
+    path, hashes = _download(tmp_path)
+    assert os.path.basename(path) == "pkg"
+    _assert_files(path, hashes)
+
+
+def test_missing_archive_without_folder_is_an_error(tmp_path):
+    _registry(str(tmp_path), {"archive": "pkg.tar.gz"})
+    with pytest.raises(FileNotFoundError):
+        _download(tmp_path)
+
+
+def test_checksum_mismatch_does_not_fall_back(tmp_path):
+    _registry(str(tmp_path), {"folder": "pkg", "archive": "pkg.tar.gz", "sha256": "0" * 64}, _tar_gz("pkg"))
+    with pytest.raises(install.ChecksumMismatch):
+        _download(tmp_path)
+    assert not os.path.exists(tmp_path / "out" / "pkg")
@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import install
+
+PAYLOAD = os.urandom(200 * 1024) + b"pkgman" * 50000
+DIGEST = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Serves PAYLOAD. With server.gzip the body is always gzip-encoded, as some
+    CDNs do whatever Accept-Encoding says. server.truncate cuts that many
+    responses short after half of the declared Content-Length.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        body = PAYLOAD
+        status = 200
+        headers = {}
+        if server.gzip:
+            body = gzip.compress(PAYLOAD)
+            headers["Content-Encoding"] = "gzip"
+        elif "Range" in self.headers:
+            start = int(self.headers["Range"][len("bytes="):].rstrip("-"))
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            body = body[start:]
+            status = 206
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if server.truncate:
+            server.truncate -= 1
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests = []
+    httpd.gzip = False
+    httpd.truncate = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}/pkg.tar"
+
+
+def test_requests_identity_encoding(server, tmp_path):
+    target = str(tmp_path / "pkg.tar")
+    digest = install.stream_download(_url(server), target, DIGEST, session=requests.Session(), retries=0)
+    assert digest == DIGEST
+    assert server.requests[0]["Accept-Encoding"] == "identity"
+
+
+def test_gzip_encoded_response_is_counted_on_the_wire(server, tmp_path):
+    server.gzip = True
+    target = str(tmp_path / "pkg.tar")
+    digest = install.stream_download(_url(server), target, DIGEST, session=requests.Session(), retries=0)
+    assert digest == DIGEST
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert not os.path.exists(target + ".part")
+
+
+def test_truncated_gzip_response_restarts_without_range(server, tmp_path):
+    server.gzip = True
+    server.truncate = 1
+    target = str(tmp_path / "pkg.tar")
+    digest = install.stream_download(_url(server), target, DIGEST, session=requests.Session(), retries=2)
+    assert digest == DIGEST
+    with open(target, "rb") as f:
+        assert f.read() == PAYLOAD
+
+
+def test_truncated_identity_response_resumes_with_range(server, tmp_path):
+    server.truncate = 1
+    target = str(tmp_path / "pkg.tar")
+    digest = install.stream_download(_url(server), target, DIGEST, session=requests.Session(), retries=2)
+    assert digest == DIGEST
+    assert len(server.requests) == 2
+    # Yarım kalan son parça yazılmaz; devam noktası parça sınırındadır
+    offset = int(server.requests[1]["Range"][len("bytes="):].rstrip("-"))
+    assert 0 < offset <= len(PAYLOAD) // 2
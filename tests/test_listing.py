@@ -0,0 +1,36 @@
+import install
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+        self.status_code = 200
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+class _TreeSession:
+    """
+    GitHub git/trees API stub whose recursive listing is truncated.
+    """
+    TREES = {
+        "root": [{"path": "install.sh", "type": "blob"}, {"path": "include", "type": "tree", "sha": "inc"}],
+        "inc": [{"path": "a.h", "type": "blob"}, {"path": "sub", "type": "tree", "sha": "sub"}],
+        "sub": [{"path": "b.h", "type": "blob"}],
+    }
+
+    def get(self, url, headers=None, timeout=None):
+        if "recursive=1" in url:
+            return _Response({"sha": "root", "truncated": True, "tree": self.TREES["root"]})
+        return _Response({"sha": url.rsplit("/", 1)[1], "tree": self.TREES[url.rsplit("/", 1)[1]]})
+
+
+def test_truncated_tree_listing_walks_subtrees(monkeypatch):
+    monkeypatch.setattr(install, "get_session", lambda: _TreeSession())
+    files = install.list_folder_files_tree("user", "repo", "main", "pkg")
+    assert sorted(files) == ["pkg/include/a.h", "pkg/include/sub/b.h", "pkg/install.sh"]
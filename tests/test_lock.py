@@ -0,0 +1,39 @@
+import os
+
+import lock
+
+
+def _entry(tmp_path, content=b"int x;\n"):
+    path = tmp_path / "vendor" / "x.h"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    before = {}
+    after = lock.snapshot(str(tmp_path / "vendor"))
+    return str(path).replace(os.sep, "/"), {"installed": lock.installed_files(before, after)}
+
+
+def test_empty_installed_map_is_not_verified():
+    assert lock.verify_installed({"installed": {}}) == (False, False)
+    assert lock.verify_installed({}) == (False, False)
+
+
+def test_intact_files_verify(tmp_path):
+    _, entry = _entry(tmp_path)
+    assert lock.verify_installed(entry) == (True, False)
+
+
+def test_changed_or_missing_files_fail(tmp_path):
+    path, entry = _entry(tmp_path)
+    with open(path, "wb") as f:
+        f.write(b"int y;\n")
+    assert lock.verify_installed(entry)[0] is False
+    os.remove(path)
+    assert lock.verify_installed(entry)[0] is False
+
+
+def test_touched_file_refreshes_mtime(tmp_path):
+    path, entry = _entry(tmp_path)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert lock.verify_installed(entry) == (True, True)
+    assert entry["installed"][path]["mtime_ns"] == st.st_mtime_ns + 10**9
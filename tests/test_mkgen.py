@@ -0,0 +1,30 @@
+import os
+
+import mkgen
+
+SOURCES = [f"src/{n}.c" for n in "abcdefgh"]
+
+
+def _unity_files(name, sources, root):
+    target = {"name": name, "type": "executable", "sources": sources, "unity": {"batch": 4}}
+    units = mkgen.compile_units("p", target, root, {})
+    return [src for src, _, _ in units if src.startswith(f"{root}/unity/")]
+
+
+def test_unity_cleanup_keeps_files_of_a_prefixed_target(tmp_path):
+    root = str(tmp_path / "build")
+    app = _unity_files("app", SOURCES, root)
+    other = _unity_files("app_unity", SOURCES, root)
+    # "app" yeniden planlanınca "app_unity" hedefinin grup dosyalarına dokunmamalı
+    assert _unity_files("app", SOURCES, root) == app
+    assert app and other
+    assert all(os.path.exists(path) for path in app + other)
+
+
+def test_unity_cleanup_removes_stale_groups(tmp_path):
+    root = str(tmp_path / "build")
+    old = _unity_files("app", SOURCES, root)
+    new = _unity_files("app", [src.replace("src/", "lib/") for src in SOURCES], root)
+    assert old and new
+    assert not any(os.path.exists(path) for path in old)
+    assert all(os.path.exists(path) for path in new)
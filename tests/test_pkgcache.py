@@ -0,0 +1,44 @@
+import os
+import time
+
+import pkgcache
+
+
+def _age(path, seconds):
+    old = time.time() - seconds
+    os.utime(path, (old, old))
+
+
+def test_download_dir_is_shared_until_released():
+    path, lock = pkgcache._download_dir("pkg-1.0-linux")
+    assert lock is not None and os.path.isdir(path)
+    # Aynı anahtarı indiren ikinci süreç özel bir klasör alır
+    other, other_lock = pkgcache._download_dir("pkg-1.0-linux")
+    assert other != path and other_lock is None
+    pkgcache._release(lock)
+    assert not os.path.exists(path + ".lock")
+
+
+def test_prune_sweeps_stale_partials_and_orphaned_locks():
+    tmp = pkgcache._tmp_dir()
+    stale, lock = pkgcache._download_dir("stale")
+    lock.close()
+    _age(stale, pkgcache.PARTIAL_MAX_AGE + 60)
+    orphan = os.path.join(tmp, "dl-0123456789abcdef.lock")
+    open(orphan, "w").close()
+
+    pkgcache.prune()
+    assert not os.path.exists(stale)
+    assert not os.path.exists(stale + ".lock")
+    assert not os.path.exists(orphan)
+
+
+def test_prune_keeps_a_partial_that_is_being_downloaded():
+    busy, lock = pkgcache._download_dir("busy")
+    _age(busy, pkgcache.PARTIAL_MAX_AGE + 60)
+    try:
+        pkgcache.prune()
+        assert os.path.isdir(busy)
+        assert os.path.exists(busy + ".lock")
+    finally:
+        pkgcache._release(lock)
@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+
+import install
+import registry
+import settings
+from lock import load_lock
+from okgman_parser import install_dependencies
+
+PLATFORM = install.host_platform()
+
+INSTALL_SH = """#!/bin/sh
+set -e
+mkdir -p vendor/include
+cp "$(dirname "$0")"/include/*.h vendor/include/
+"""
+
+
+def _write(path, data, mode=0o644):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(data)
+    os.chmod(path, mode)
+
+
+def _package(root, name, version, dependencies=None):
+    folder = f"{name}-{version}"
+    _write(os.path.join(root, folder, "install.sh"), INSTALL_SH, 0o755)
+    _write(os.path.join(root, folder, "include", f"{name}.h"), f"#define {name.upper()}_VERSION \"{version}\"\n")
+    entry = {PLATFORM: {"folder": folder}}
+    if dependencies:
+        entry["dependencies"] = dependencies
+    return {version: entry}
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = str(tmp_path / "registry")
+    index = {"packages": {
+        "app": _package(root, "app", "1.0", {"zlib": "1.2"}),
+        "zlib": {**_package(root, "zlib", "1.2"), **_package(root, "zlib", "1.3")},
+    }}
+    _write(os.path.join(root, "package.json"), json.dumps(index))
+    return root
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    path = tmp_path / "project"
+    path.mkdir()
+    monkeypatch.chdir(path)
+    return path
+
+
+def test_install_from_file_registry(source, project, capsys):
+    settings.override("registries", [f"file://{source}"])
+    install_dependencies([{"name": "app", "version": "latest"}])
+
+    assert (project / "vendor/include/app.h").exists()
+    # app zlib@1.2'yi sabitler; en yeni 1.3 değil
+    assert (project / "vendor/include/zlib.h").read_text() == '#define ZLIB_VERSION "1.2"\n'
+    lock = load_lock()
+    assert lock["packages"]["zlib"]["version"] == "1.2"
+    assert set(lock["packages"]["app"]["installed"]) == {"vendor/include/app.h"}
+
+    capsys.readouterr()
+    install_dependencies([{"name": "app", "version": "latest"}])
+    out = capsys.readouterr().out
+    assert "app 1.0 satisfied" in out and "zlib 1.2 satisfied" in out
+
+
+def test_install_from_mirror_without_source(source, project, tmp_path):
+    mirror = str(tmp_path / "mirror")
+    registry.mirror_packages(["app@1.0"], mirror, platforms=[PLATFORM], source=f"file://{source}")
+
+    with open(os.path.join(mirror, "package.json")) as f:
+        index = json.load(f)
+    entry = index["packages"]["zlib"]["1.2"][PLATFORM]
+    assert set(entry["files"]) == {"install.sh", "include/zlib.h"}
+    assert "1.3" not in index["packages"]["zlib"]
+
+    # Kaynak silinse de ayna tek başına yeter
+    os.rename(source, source + ".gone")
+    settings.reset()
+    settings.override("backoff", 0)
+    settings.override("registries", [f"file://{mirror}"])
+    install_dependencies([{"name": "app", "version": "1.0"}])
+    assert (project / "vendor/include/zlib.h").exists()
+
+
+def test_mirror_hash_mismatch_is_rejected(source, project, tmp_path):
+    mirror = str(tmp_path / "mirror")
+    registry.mirror_packages(["zlib@1.3"], mirror, platforms=[PLATFORM], source=f"file://{source}")
+    _write(os.path.join(mirror, "zlib-1.3", "include", "zlib.h"), "tampered\n")
+
+    settings.override("registries", [f"file://{mirror}"])
+    with pytest.raises(install.ChecksumMismatch):
+        install_dependencies([{"name": "zlib", "version": "1.3"}])
+    assert not (project / "vendor").exists()
@@ -0,0 +1,82 @@
+import pytest
+
+from resolver import resolve_graph, topological_order
+
+# Stub registry: {name: {version: {dependency: version}}}; "latest" is the
+# highest listed version, as in install.resolve_package.
+INDEX = {
+    "a": {"1.0": {}, "2.0": {"c": "2.0"}},
+    "b": {"1": {"a": "1.0"}},
+    "c": {"1.0": {}, "2.0": {}},
+    "d": {"1": {"b": "1"}},
+    "e": {"1": {"a": "2.0"}},
+}
+
+
+def lookup_from(index, calls=None):
+    def lookup(name, version):
+        if calls is not None:
+            calls.append((name, version))
+        versions = index[name]
+        if version in (None, "latest"):
+            version = max(versions)
+        return {"name": name, "version": version, "dependencies": dict(versions[version])}
+    return lookup
+
+
+def deps(*pairs):
+    return [{"name": name, "version": version} for name, version in pairs]
+
+
+def versions(nodes):
+    return {name: info["version"] for name, info in nodes.items()}
+
+
+def test_latest_without_pins():
+    nodes, edges, order = resolve_graph(deps(("a", "latest")), lookup_from(INDEX))
+    assert versions(nodes) == {"a": "2.0", "c": "2.0"}
+    assert order == ["c", "a"]
+
+
+def test_latest_follows_a_deeper_pin():
+    nodes, edges, order = resolve_graph(deps(("a", "latest"), ("b", "1")), lookup_from(INDEX))
+    assert versions(nodes) == {"a": "1.0", "b": "1"}
+    # a@2.0 bağımlılığı c artık grafikte değil
+    assert edges == {"a": set(), "b": {"a"}}
+    assert order == ["a", "b"]
+
+
+def test_pin_two_levels_down():
+    nodes, _, _ = resolve_graph(deps(("a", None), ("d", "1")), lookup_from(INDEX))
+    assert versions(nodes) == {"a": "1.0", "b": "1", "d": "1"}
+
+
+def test_disagreeing_pins_conflict():
+    with pytest.raises(Exception, match=r"Version conflict for 'a': b requires 1.0, e requires 2.0"):
+        resolve_graph(deps(("b", "1"), ("e", "1")), lookup_from(INDEX))
+
+
+def test_project_pin_against_dependency_pin():
+    with pytest.raises(Exception, match=r"<project> requires 2.0, b requires 1.0"):
+        resolve_graph(deps(("a", "2.0"), ("b", "1")), lookup_from(INDEX))
+
+
+def test_lookups_are_not_repeated():
+    calls = []
+    resolve_graph(deps(("a", "latest"), ("b", "1")), lookup_from(INDEX, calls))
+    assert len(calls) == len(set(calls))
+
+
+def test_unsettled_versions_raise():
+    # x@latest (2) sabitler y@1; y@1 x@1'i sabitler; x@1 y@2'yi sabitler ...
+    index = {
+        "x": {"1": {"y": "2"}, "2": {"y": "1"}},
+        "y": {"1": {"x": "1"}, "2": {}},
+    }
+    with pytest.raises(Exception, match="do not settle"):
+        resolve_graph(deps(("x", "latest")), lookup_from(index))
+
+
+def test_cycle_is_reported():
+    with pytest.raises(Exception, match=r"Dependency cycle: a -> b -> a"):
+        topological_order({"a": {"b"}, "b": {"a"}})
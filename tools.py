@@ -1,4 +1,11 @@
+import os
+import json
+import shlex
 import shutil
+import hashlib
+import tempfile
+import subprocess
+import settings
 from colorama import Fore, Style
 
 
@@ -24,4 +31,166 @@ def find_ar():
         if path:
             print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Archiver found: {ar}")
             return ar
-    raise RuntimeError(f"{Fore.RED}[PANIC]{Style.RESET_ALL} No archiver found.")
\ No newline at end of file
+    raise RuntimeError(f"{Fore.RED}[PANIC]{Style.RESET_ALL} No archiver found.")
+
+# ----------------------------------------
+# Araç zinciri profili: sürüm, hedef ve hızlı yol yetenekleri
+#
+# Yoklamalar derleyici süreçleri başlattığı için sonuç
+# <cache_dir>/toolchain/<anahtar>.json içinde saklanır. Anahtar CC/AR/LD
+# ikililerinin gerçek yolu, boyutu ve mtime'ıdır; derleyici güncellenince
+# profil kendiliğinden yeniden çıkarılır.
+# ----------------------------------------
+
+PROFILE_VERSION = 1
+FAST_LINKERS = ("mold", "lld", "gold")  # en hızlıdan yavaşa
+
+_profiles = {}
+
+
+def _first_on_path(candidates):
+    for name in candidates:
+        if shutil.which(name):
+            return name
+    return None
+
+
+def tool_argv(value):
+    """
+    argv prefix for a CC/AR/LD value, which may carry a wrapper or flags
+    ("ccache gcc", "gcc -m32").
+    """
+    return shlex.split(value) if isinstance(value, str) else list(value)
+
+
+def tool_identity(value):
+    """
+    [realpath, mtime_ns, size] of the tool's binary followed by the rest of
+    its argv ("ccache gcc", "gcc -m32"), or None if the binary is not found.
+    """
+    # Kimlik ilk sözcüğün ikilisidir; kalan sözcükler bayrak olarak anahtara girer
+    argv = tool_argv(value)
+    path = shutil.which(argv[0]) if argv else None
+    if not path:
+        return None
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    return [path, st.st_mtime_ns, st.st_size] + argv[1:]
+
+
+def _binary_identity(value):
+    identity = tool_identity(value)
+    if identity is None:
+        raise RuntimeError(f"{Fore.RED}[PANIC]{Style.RESET_ALL} Tool not found: {value}")
+    return identity
+
+
+def _run(cmd, cwd=None):
+    try:
+        return subprocess.run(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def _succeeds(cmd, cwd=None):
+    result = _run(cmd, cwd)
+    return result is not None and result.returncode == 0
+
+
+def _probe(cc, ar):
+    cc, ar = tool_argv(cc), tool_argv(ar)
+    version = _run([*cc, "--version"])
+    version_text = version.stdout if version else ""
+    version_line = version_text.splitlines()[0] if version_text else ""
+    if "clang" in version_line.lower():
+        kind = "clang"
+    elif "gcc" in version_line.lower() or "Free Software Foundation" in version_text:
+        kind = "gcc"
+    else:
+        kind = "unknown"
+    target = _run([*cc, "-dumpmachine"])
+
+    with tempfile.TemporaryDirectory(prefix="pkgman-probe-") as tmp:
+        with open(os.path.join(tmp, "t.c"), "w") as f:
+            f.write("int main(void) { return 0; }\n")
+        with open(os.path.join(tmp, "p.h"), "w") as f:
+            f.write("int probe(void);\n")
+
+        linkers = [ld for ld in FAST_LINKERS if _succeeds([*cc, f"-fuse-ld={ld}", "t.c", "-o", f"t-{ld}"], tmp)]
+
+        split_dwarf = (_succeeds([*cc, "-gsplit-dwarf", "-c", "t.c", "-o", "sd.o"], tmp)
+                       and os.path.exists(os.path.join(tmp, "sd.dwo")))
+
+        # gcc: p.h.gch yanına konur ve -include ile bulunur; clang: -include-pch
+        if kind == "clang":
+            pch = "clang" if (_succeeds([*cc, "-x", "c-header", "p.h", "-o", "p.h.pch"], tmp)
+                              and _succeeds([*cc, "-include-pch", "p.h.pch", "-c", "t.c", "-o", "pch.o"], tmp)) else None
+        else:
+            pch = "gcc" if (_succeeds([*cc, "-x", "c-header", "p.h", "-o", "p.h.gch"], tmp)
+                            and _succeeds([*cc, "-include", "p.h", "-Winvalid-pch", "-c", "t.c", "-o", "pch.o"], tmp)) else None
+
+        time_trace = _succeeds([*cc, "-ftime-trace", "-c", "t.c", "-o", "tt.o"], tmp)
+
+        thin_archives = False
+        if _succeeds([*cc, "-c", "t.c", "-o", "a.o"], tmp) and _succeeds([*ar, "rcsT", "thin.a", "a.o"], tmp):
+            with open(os.path.join(tmp, "thin.a"), "rb") as f:
+                thin_archives = f.read(8) == b"!<thin>\n"
+
+    return {
+        "kind": kind,
+        "version": version_line,
+        "target": target.stdout.strip() if target and target.returncode == 0 else None,
+        "linkers": linkers,
+        "split_dwarf": split_dwarf,
+        "pch": pch,
+        "time_trace": time_trace,
+        "thin_archives": thin_archives,
+    }
+
+
+def toolchain_profile(cc=None, ar=None, ld=None):
+    """
+    Resolve CC/AR/LD (LD defaults to the compiler driver) and return their
+    profile, probing only when no profile is stored for these binaries.
+    """
+    cc = cc or _first_on_path(["cc", "gcc", "clang"]) or find_cc()
+    ar = ar or _first_on_path(["ar", "llvm-ar"]) or find_ar()
+    ld = ld or cc
+
+    identity = {"cc": _binary_identity(cc), "ar": _binary_identity(ar), "ld": _binary_identity(ld)}
+    key = hashlib.sha256(json.dumps([PROFILE_VERSION, identity]).encode()).hexdigest()[:32]
+    if key in _profiles:
+        return _profiles[key]
+
+    path = os.path.join(settings.cache_dir(), "toolchain", f"{key}.json")
+    profile = None
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                profile = json.load(f)
+        except ValueError:
+            profile = None
+
+    if profile is None:
+        profile = {"CC": cc, "AR": ar, "LD": ld, "identity": identity, "features": _probe(cc, ar)}
+        features = profile["features"]
+        print(f"{Fore.GREEN}[OK]{Style.RESET_ALL} Toolchain: {features['version'] or cc} ({features['target']})")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(profile, f, indent=2)
+        os.replace(tmp_path, path)
+
+    # Aynı ikiliye farklı adlarla (cc/gcc) ulaşılabilir; komutlarda istenen ad kullanılsın
+    profile = dict(profile, CC=cc, AR=ar, LD=ld)
+    _profiles[key] = profile
+    return profile
+
+
+def fast_link_flags(profile):
+    """
+    Flags that select the fastest linker the compiler driver accepts.
+    """
+    if profile["LD"] != profile["CC"] or not profile["features"]["linkers"]:
+        return []
+    return [f"-fuse-ld={profile['features']['linkers'][0]}"]
@@ -0,0 +1,325 @@
+import os
+import sys
+import glob
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from collections import defaultdict
+from colorama import Fore, Style
+import settings
+import objcache
+import depdb
+import srcindex
+from mkgen import build_context, eval_config
+from engine import plan_actions, run_actions
+from okgman_parser import install_dependencies
+
+# ----------------------------------------
+# pkgman watch: süreç içinde kalan artımlı derleme
+#
+# build_context, araç zinciri profili (tools içinde önbellekli), eylem grafiği
+# ve bağımlılık veritabanı bellekte tutulur. Kaynaklar, başlıklar ve
+# pkgman.py inotify ile izlenir (yoksa stat yoklaması). Bir kayıt patlaması
+# debounce süresi boyunca toplanır; yalnızca değişen dosyayı okuyan eylemler
+# ve onlara bağlı olanlar yeniden değerlendirilir. pkgman.py ya da files()
+# sonuçları değişirse yapılandırma yeniden çalıştırılıp grafik yeniden kurulur.
+# ----------------------------------------
+
+PKGMAN_PATH = "pkgman.py"
+BUILD_ROOT = "build"
+DEFAULT_DEBOUNCE = 100  # ms
+POLL_INTERVAL = 0.5     # saniye
+
+# linux/inotify.h
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+# Kuyruk taştı: hangi dosyaların değiştiği bilinmiyor
+OVERFLOW = "\0overflow"
+
+# ----------------------------------------
+# İzleyiciler: inotify (Linux) ve stat yoklaması
+# ----------------------------------------
+
+def _open_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    return {"kind": "inotify", "libc": libc, "fd": fd, "dirs": {}, "wds": {}}
+
+
+def _open_poll():
+    return {"kind": "poll", "paths": {}}
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def watch_paths(watcher, dirs, files):
+    """
+    Cover `dirs` (creations, renames, deletions) and `files`. Returns False
+    if inotify ran out of watches.
+    """
+    if watcher["kind"] == "poll":
+        old = watcher["paths"]
+        # Bilinen yolların eski kaydı korunur: derleme sırasında yapılan değişiklik kaçmaz
+        watcher["paths"] = {p: old[p] if p in old else _stat(p) for p in set(dirs) | set(files)}
+        return True
+    for d in set(dirs) - set(watcher["dirs"]):
+        wd = watcher["libc"].inotify_add_watch(watcher["fd"], os.fsencode(d), WATCH_MASK)
+        if wd < 0:
+            if ctypes.get_errno() == errno.ENOSPC:
+                return False
+            continue
+        watcher["dirs"][d] = wd
+        watcher["wds"][wd] = d
+    return True
+
+
+def _read_inotify(watcher, timeout):
+    ready, _, _ = select.select([watcher["fd"]], [], [], timeout)
+    if not ready:
+        return set()
+    try:
+        data = os.read(watcher["fd"], 64 * 1024)
+    except BlockingIOError:
+        return set()
+    changed = set()
+    offset = 0
+    while offset < len(data):
+        wd, mask, _, length = _EVENT.unpack_from(data, offset)
+        offset += _EVENT.size
+        name = data[offset:offset + length].rstrip(b"\0")
+        offset += length
+        if mask & IN_Q_OVERFLOW:
+            changed.add(OVERFLOW)
+        elif wd in watcher["wds"]:
+            changed.add(os.path.normpath(os.path.join(watcher["wds"][wd], os.fsdecode(name))))
+    return changed
+
+
+def _read_poll(watcher, timeout):
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        delay = POLL_INTERVAL if deadline is None else min(POLL_INTERVAL, max(deadline - time.monotonic(), 0))
+        time.sleep(delay)
+        paths = watcher["paths"]
+        changed = set()
+        for p, known in paths.items():
+            current = _stat(p)
+            if current != known:
+                paths[p] = current
+                changed.add(p)
+        if changed or (deadline is not None and time.monotonic() >= deadline):
+            return changed
+
+
+def wait_for_changes(watcher, debounce):
+    """
+    Block until something changes, then keep collecting until nothing has
+    changed for `debounce` seconds (editors often write several times).
+    """
+    read = _read_inotify if watcher["kind"] == "inotify" else _read_poll
+    changed = set()
+    while not changed:
+        changed = read(watcher, None)
+    while True:
+        more = read(watcher, debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+def close(watcher):
+    if watcher["kind"] == "inotify":
+        os.close(watcher["fd"])
+
+# ----------------------------------------
+# Bellekteki grafik
+# ----------------------------------------
+
+def _in_build_root(path):
+    return path == BUILD_ROOT or path.startswith(BUILD_ROOT + os.sep)
+
+
+def _glob_base(pattern):
+    parts = []
+    for part in os.path.normpath(os.path.dirname(pattern) or ".").split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return os.sep.join(parts) or "."
+
+
+def configure(state):
+    """
+    (Re)evaluate pkgman.py and plan the action graph. On a config error the
+    previous graph is kept and False is returned.
+    """
+    saved = dict(build_context)
+    try:
+        eval_config(PKGMAN_PATH)
+        if build_context["dependencies"] and build_context["dependencies"] != saved["dependencies"]:
+            install_dependencies(build_context["dependencies"])
+        actions = plan_actions(BUILD_ROOT)
+    except (Exception, SystemExit) as e:
+        build_context.clear()
+        build_context.update(saved)
+        if not isinstance(e, SystemExit):
+            print(f"{Fore.RED}[ERROR]{Style.RESET_ALL} {e}")
+        return False
+
+    dependents = defaultdict(set)
+    for aid, action in actions.items():
+        for dep in action["deps"]:
+            dependents[dep].add(aid)
+    state["actions"] = actions
+    state["dependents"] = dependents
+    srcindex.save()
+    return True
+
+
+def index_inputs(state):
+    """
+    Map each source path to the actions that read it: planned inputs plus
+    the headers every output was last built from. Returns (dirs, files) to
+    watch.
+    """
+    actions = state["actions"]
+    db = state["db"]
+    outputs = {os.path.normpath(o) for a in actions.values() for o in a["outputs"]}
+    users = defaultdict(set)
+    for aid, action in actions.items():
+        paths = list(action["inputs"])
+        entry = db["objects"].get(action["outputs"][0]) if action["outputs"] else None
+        if entry is not None:
+            paths += list(entry["deps"])
+        for p in paths:
+            p = os.path.normpath(p)
+            if p not in outputs and not _in_build_root(p):
+                users[p].add(aid)
+    state["users"] = users
+
+    files = set(users) | {PKGMAN_PATH}
+    dirs = {os.path.dirname(p) or "." for p in files}
+    dirs |= {_glob_base(pattern) for pattern in build_context["globs"]}
+    return {d for d in dirs if os.path.isdir(d)}, files
+
+
+def globs_changed():
+    return any(srcindex.glob(pattern) != result for pattern, result in build_context["globs"].items())
+
+
+def affected(state, changed):
+    """
+    Actions reading a changed path, plus everything downstream of them.
+    """
+    result = set()
+    stack = [aid for p in changed for aid in state["users"].get(p, ())]
+    while stack:
+        aid = stack.pop()
+        if aid not in result:
+            result.add(aid)
+            stack.extend(state["dependents"][aid])
+    return result
+
+
+def run_subset(state, ids, jobs=None, keep_going=False):
+    """
+    Run the given actions in plan order; edges to actions outside the
+    subset are dropped (those are already up to date).
+    """
+    actions = state["actions"]
+    subset = {aid: dict(actions[aid], deps=[d for d in actions[aid]["deps"] if d in ids])
+              for aid in actions if aid in ids}
+    ok = run_actions(subset, jobs=jobs, keep_going=keep_going, db=state["db"])
+    # Başarısız eylemler bir sonraki değişiklikte (neyi değiştirirse değiştirsin) yeniden denenir
+    state["retry"] = set() if ok else set(subset)
+    return ok
+
+# ----------------------------------------
+# Ana döngü
+# ----------------------------------------
+
+def _rewatch(state, watcher):
+    dirs, files = index_inputs(state)
+    if watch_paths(watcher, dirs, files):
+        return watcher
+    print(f"{Fore.YELLOW}[WARN]{Style.RESET_ALL} inotify watch limit reached, falling back to polling.")
+    close(watcher)
+    watcher = _open_poll()
+    watch_paths(watcher, dirs, files)
+    return watcher
+
+
+def watch(jobs=None, keep_going=False, debounce=DEFAULT_DEBOUNCE, poll=False):
+    """
+    Build once, then rebuild what a change affects until interrupted.
+    `debounce` is in milliseconds.
+    """
+    if not os.path.exists(PKGMAN_PATH):
+        raise FileNotFoundError(f"{Fore.RED}[PANIC]{Style.RESET_ALL} {PKGMAN_PATH} not found.")
+
+    state = {"actions": {}, "dependents": defaultdict(set), "users": {}, "db": depdb.load(), "retry": set()}
+    watcher = None if poll else _open_inotify()
+    if watcher is None:
+        watcher = _open_poll()
+
+    try:
+        if configure(state):
+            run_subset(state, set(state["actions"]), jobs, keep_going)
+        watcher = _rewatch(state, watcher)
+        print(f"{Fore.CYAN}[WATCH]{Style.RESET_ALL} Watching {len(state['users']) + 1} files "
+              f"({watcher['kind']}). Press Ctrl+C to stop.")
+
+        while True:
+            changed = wait_for_changes(watcher, debounce / 1000)
+            start = time.perf_counter()
+            if OVERFLOW in changed or PKGMAN_PATH in changed or globs_changed():
+                print(f"{Fore.YELLOW}[INFO]{Style.RESET_ALL} Build inputs changed, re-reading {PKGMAN_PATH}")
+                if not configure(state):
+                    continue
+                ids = set(state["actions"])
+            else:
+                ids = affected(state, changed) | state["retry"]
+            if not ids:
+                continue
+
+            objcache.reset()
+            ok = run_subset(state, ids, jobs, keep_going)
+            watcher = _rewatch(state, watcher)
+            color = Fore.GREEN if ok else Fore.RED
+            print(f"{color}[WATCH]{Style.RESET_ALL} {'Rebuilt' if ok else 'Failed'} in "
+                  f"{time.perf_counter() - start:.2f}s, waiting for changes...")
+    except KeyboardInterrupt:
+        print(f"\n{Fore.BLUE}[WATCH]{Style.RESET_ALL} Stopped.")
+    finally:
+        close(watcher)
+        if settings.get("objcache"):
+            objcache.prune_if_needed()
+
+
+def run_watch_command(args):
+    watch(jobs=args.get("jobs"), keep_going=args.get("keep-going", False),
+          debounce=args.get("debounce", DEFAULT_DEBOUNCE), poll=args.get("poll", False))